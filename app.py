@@ -1,16 +1,39 @@
 # --- 0. 필요한 라이브러리 가져오기 ---
 import streamlit as st
 import pandas as pd
+import numpy as np
 import folium
-import re
 from streamlit_folium import st_folium
+from streamlit.runtime.scriptrunner_utils.exceptions import (RerunException,
+                                                             StopException)
 import os
 from datetime import datetime
-from geopy.geocoders import Nominatim
-from geopy.extra.rate_limiter import RateLimiter
 import urllib.parse
 import json
 import time
+import loaders
+from geocache import GeocodeCache, ReverseGeocodeCache
+from geocoding import GeocodingJob, GeocodingPipeline, make_backend
+from clusters import ClusterIndex
+from count_cube import CountCube
+from data_store import freeze, share, view
+from data_watch import changed_files, file_version
+from filter_index import FilterIndex
+from instrumentation import RunTrace, StageMetrics, note_cache_miss
+from layers import (CABLE_STYLE, EMD_COLUMN, MAP_CENTER, MAP_ZOOM,
+                    RECOVERY_POPUP_FIELDS, PrebuiltGeoJson, add_cluster_areas,
+                    build_base_map, build_cable_pyramid, build_popup_table,
+                    feature_collection, lod_tier_for_zoom, overlay_groups,
+                    progress_marker_data, progress_marker_layer,
+                    progress_popup_fields, recovery_marker_data,
+                    recovery_marker_layer, with_stable_ids)
+from loaders import (CLUSTER_FILE, attach_geocoded_coords, load_cable,
+                     load_progress, load_progress_map, load_recovery,
+                     load_repeater, recovery_emds, station_latlon)
+from proximity import CableProximity, StationCableDistances
+from reverse_geocoding import DEFAULT_GRID_M, NearestPlaces, ReverseGeocoder
+from spatial_index import (GridIndex, bbox_contains, estimate_view_bbox,
+                           expand_bbox)
 
 # --- 1. 페이지 기본 설정 ---
 st.set_page_config(page_title="유선 가평재난 대응 대시보드", page_icon="🗺️", layout="wide")
@@ -26,236 +49,395 @@ st.markdown("""
 
 
 # --- 2-1. 광케이블 데이터 로딩 함수 ---
-@st.cache_data
-def load_cable_data(filename):
+# 읽기와 가공, 스냅샷은 loaders 모듈이 맡고, 여기서는 프로세스 캐시와 화면 표시만 더한다.
+# version(입력 파일의 수정 시각, 크기)은 캐시 키로만 쓰여, 파일이 바뀐 로더만 다시 실행되게 한다.
+# 로더 결과는 모든 세션이 한 벌을 같이 쓰는 읽기 전용 핸들이며, 세션은 view()로 받아 쓴다.
+@st.cache_resource(max_entries=2)
+def load_cable_data(filename, version):
+    note_cache_miss()
     if not os.path.exists(filename): return None
-    try:
-        df = pd.read_excel(filename)
-    except Exception as e:
-        st.error(f"'{filename}' 읽기 오류: {e}")
-        return None
+    return share(load_cable(filename, report=st.error))
 
-    def parse_linestring_for_apply(text):
-        if not isinstance(text, str): return None
-        try:
-            coords_str = re.findall(r'(\d+\.\d+\s\d+\.\d+)', text)
-            if not coords_str: return None
-            return [[float(p.split()[1]),
-                     float(p.split()[0])] for p in coords_str]
-        except (ValueError, IndexError):
-            return None
 
-    if '공간위치G' not in df.columns: return None
-    df['parsed_coords'] = df['공간위치G'].apply(parse_linestring_for_apply)
-    return df.dropna(subset=['parsed_coords']).copy()
+# --- 2-2. 복구 상태 데이터 로딩 함수 ---
+# 지오코딩 결과는 디스크(SQLite)에 남겨 데이터 새로고침 후에도 재사용한다.
+@st.cache_resource
+def get_geocode_cache():
+    return GeocodeCache()
 
 
-# --- 2-2. 복구 상태 데이터 로딩 함수 ---
-@st.cache_data
-def load_recovery_status_data(filename):
+@st.cache_resource(max_entries=2)
+def load_recovery_status_data(filename, version):
+    note_cache_miss()
     if not os.path.exists(filename): return None
-    try:
-        df = pd.read_excel(filename)
-    except Exception as e:
-        st.error(f"'{filename}' 읽기 오류: {e}")
-        return None
-
-    def geocode_address(address, geolocator):
-        if not isinstance(address, str) or not address.strip():
-            return None
-        try:
-            location = geolocator(address)
-            if location:
-                return (location.latitude, location.longitude)
-            return None
-        except Exception as e:
-            return None
-
-    geolocator_instance = Nominatim(user_agent="gapyeong_dashboard_app_v3",
-                                    timeout=10)
-    geocode_with_delay = RateLimiter(geolocator_instance.geocode,
-                                     min_delay_seconds=1)
-
-    ADDRESS_COLUMN = '주소'
-    if ADDRESS_COLUMN in df.columns:
-        df[['geocoded_lat', 'geocoded_lon']] = df[ADDRESS_COLUMN].apply(
-            lambda addr: pd.Series(geocode_address(addr, geocode_with_delay)))
-    else:
-        df['geocoded_lat'] = None
-        df['geocoded_lon'] = None
-
-    def parse_dms_to_dd(dms_str):
-        if not isinstance(dms_str, str): return None
-        try:
-            parts = re.match(r'([NSEW])\s*(\d+):(\d+):([\d\.]+)',
-                             dms_str.strip())
-            if not parts: return None
-            direction, degrees, minutes, seconds = parts.groups()
-            degrees, minutes, seconds = float(degrees), float(minutes), float(
-                seconds)
-            dd = degrees + (minutes / 60.0) + (seconds / 3600.0)
-            if direction in ('S', 'W'): dd *= -1
-            return dd
-        except (ValueError, TypeError):
-            return None
-
-    LAT_DATA_COLUMN = '경도'
-    LON_DATA_COLUMN = '위도'
-
-    if LAT_DATA_COLUMN in df.columns and LON_DATA_COLUMN in df.columns:
-        df['latitude_dd'] = df[LAT_DATA_COLUMN].apply(parse_dms_to_dd)
-        df['longitude_dd'] = df[LON_DATA_COLUMN].apply(parse_dms_to_dd)
-    else:
-        df['latitude_dd'] = None
-        df['longitude_dd'] = None
-
-    df_valid = df[(df['geocoded_lat'].notna() & df['geocoded_lon'].notna()) |
-                  (df['latitude_dd'].notna()
-                   & df['longitude_dd'].notna())].copy()
-
-    return df_valid
+    return share(load_recovery(filename, report=st.error))
+
+
+# 지오코딩 파이프라인과 작업은 프로세스 전체에서 공유해 여러 세션이 같은 주소를
+# 중복 조회하지 않도록 한다.
+@st.cache_resource
+def get_geocoding_pipeline():
+    return GeocodingPipeline(make_backend(), get_geocode_cache())
+
+
+@st.cache_resource(max_entries=4)
+def start_geocoding_job(address_keys):
+    return GeocodingJob(get_geocoding_pipeline(), address_keys)
+
+
+# 지도 클릭 위치 역지오코딩. 주소 지오코딩과 같은 백엔드와 요청 한도를 쓰고,
+# 격자 간격(m)은 REVERSE_GEOCODE_GRID_M 환경 변수로 바꿀 수 있다.
+@st.cache_resource
+def get_reverse_geocoder():
+    pipeline = get_geocoding_pipeline()
+    return ReverseGeocoder(pipeline.backend,
+                           ReverseGeocodeCache(),
+                           grid_m=float(
+                               os.environ.get('REVERSE_GEOCODE_GRID_M',
+                                              DEFAULT_GRID_M)),
+                           budget=pipeline.budget)
+
+
+# 역지오코딩이 안 될 때 쓰는 오프라인 조회표: 국소 주소와 광케이블 읍면동
+@st.cache_resource(max_entries=2)
+def get_offline_places(recovery_key, cable_version, _df_recovery, _df_cable,
+                       _cable_coords):
+    lat, lon, labels = [], [], []
+    if _df_recovery is not None and '주소' in _df_recovery.columns:
+        station_lat, station_lon = station_latlon(_df_recovery)
+        lat.append(station_lat)
+        lon.append(station_lon)
+        labels.append(_df_recovery['주소'].to_numpy(dtype=object))
+    if _df_cable is not None and EMD_COLUMN in _df_cable.columns:
+        coords = _cable_coords.coords
+        lat.append(coords[:, 0])
+        lon.append(coords[:, 1])
+        labels.append(
+            np.repeat(
+                (_df_cable[EMD_COLUMN].astype(object) + " 광케이블").to_numpy(),
+                _cable_coords.lengths))
+    if not labels: return NearestPlaces([], [], [])
+    return freeze(
+        NearestPlaces(np.concatenate(lat), np.concatenate(lon),
+                      np.concatenate(labels)))
 
 
 # --- 2-3. 진행 현황 데이터 로딩 함수 ---
-@st.cache_data
-def load_progress_data(filename):
+@st.cache_resource(max_entries=2)
+def load_progress_data(filename, version):
+    note_cache_miss()
     if not os.path.exists(filename):
         st.warning(f"'{filename}' 파일을 찾을 수 없어 해당 기능을 비활성화합니다.")
         return None
-    try:
-        df = pd.read_excel(filename, sheet_name=0)
-        return df
-    except Exception as e:
-        st.error(f"'{filename}' 파일 읽기 오류: {e}")
-        return None
+    return share(
+        load_progress(filename,
+                      lambda: read_progress_workbook(filename, version),
+                      report=st.error))
+
+
+# '진행현황.xlsx'의 두 시트는 한 번 열어 함께 읽는다.
+# 진행 현황/중계기 두 로더의 스냅샷이 모두 없을 때도 파일은 한 번만 읽힌다.
+@st.cache_data(max_entries=1)
+def read_progress_workbook(filename, version):
+    return loaders.read_progress_workbook(filename, report=st.error)
+
+
+@st.cache_resource(max_entries=2)
+def load_progress_map_data(filename, version):
+    note_cache_miss()
+    return share(
+        load_progress_map(filename, view(load_progress_data(filename,
+                                                            version))))
 
 
 # --- 2-4. 중계기 현황 데이터 로딩 함수 ---
-@st.cache_data
-def load_repeater_recovery_data(filename):
+@st.cache_resource(max_entries=2)
+def load_repeater_recovery_data(filename, version):
+    note_cache_miss()
     if not os.path.exists(filename):
         st.warning(f"'{filename}' 파일을 찾을 수 없어 '복구예정 중계기' 테이블을 표시할 수 없습니다.")
         return None
-    try:
-        df = pd.read_excel(filename, sheet_name='Sheet2')
-        return df
-    except Exception as e:
-        st.error(
-            f"'{filename}' 파일에서 'Sheet2' 시트를 읽는 중 오류가 발생했습니다. 시트 이름이 정확한지 확인해주세요. (오류: {e})"
-        )
-        return None
+    return share(
+        load_repeater(filename,
+                      lambda: read_progress_workbook(filename, version),
+                      report=st.error))
+
+
+# --- 2-5. 광케이블 지도 레이어 ---
+# 단순화 단계별 레이어를 데이터 버전마다 한 번만 만들어 모든 세션이 같이 쓴다.
+@st.cache_resource(max_entries=2)
+def get_cable_pyramid(data_version, _df_cable, _cable_coords):
+    return freeze(build_cable_pyramid(_df_cable, _cable_coords))
+
+
+# --- 2-6. 화면 범위 인덱스 ---
+# 케이블 경계 상자와 국소 좌표의 격자 인덱스도 데이터 버전마다 한 번만 만든다.
+# 복구 국소는 지오코딩으로 좌표가 늘어나므로 좌표가 붙은 국소 수까지 키에 넣는다.
+@st.cache_resource(max_entries=2)
+def get_cable_index(data_version, _cable_coords):
+    return freeze(GridIndex(_cable_coords.bounds()))
+
+
+# 창 안의 케이블을 이은 GeoJSON 문자열. 같은 단계/창/선택이면 다시 잇지 않는다.
+@st.cache_resource(max_entries=16)
+def get_cable_overlay_json(data_version, tier, window, emds, _df_cable,
+                           _cable_pyramid, _cable_index):
+    cable_ids = _cable_index.query(window)
+    if emds is not None:
+        cable_ids = cable_ids[_df_cable[EMD_COLUMN].iloc[cable_ids].isin(
+            emds).to_numpy()]
+    if not len(cable_ids): return None
+    return feature_collection(_cable_pyramid[tier]['features'][cable_ids])
+
+
+@st.cache_resource(max_entries=8)
+def get_station_index(data_version, _lat, _lon):
+    return freeze(GridIndex.from_points(_lat, _lon))
+
+
+# 복구 상태/점검 내역 필터용 비트맵 인덱스. 복구 국소 격자 인덱스와 같은 키를 쓴다.
+@st.cache_resource(max_entries=4)
+def get_recovery_filter_index(recovery_key, _df_recovery):
+    return freeze(
+        FilterIndex(_df_recovery, ['복구상태', '점검내역(정전/선로불량/유니트)']))
+
+
+# 지표용 집계 큐브. 읍면동은 '지역'(예: '경기 가평군 가평읍')에서 읍/면/동 단어를 뽑아 만들고,
+# 클러스터 배정이 들어가므로 클러스터 영역 버전도 키에 넣는다.
+@st.cache_resource(max_entries=4)
+def get_recovery_cube(recovery_key, cluster_version, _df_recovery):
+    df = _df_recovery
+    if '지역' in df.columns:
+        df = df.assign(**{EMD_COLUMN: recovery_emds(df)})
+    return CountCube(
+        df, ['복구상태', '점검내역(정전/선로불량/유니트)', EMD_COLUMN, CLUSTER_COLUMN])
+
+
+# 국소별 가장 가까운 광케이블과 거리(m). 케이블 선분 인덱스는 케이블 데이터 버전마다 한 번만 만든다.
+@st.cache_resource(max_entries=2)
+def get_cable_proximity(data_version, _cable_coords):
+    return freeze(CableProximity(_cable_coords))
+
+
+# 국소 좌표가 바뀐 행만 다시 계산하므로, 지오코딩이 진행되는 동안에도 키는 데이터 버전만 쓴다.
+@st.cache_resource(max_entries=4)
+def get_station_cable_distances(recovery_version, cable_version, _proximity):
+    return StationCableDistances(_proximity)
+
+
+# --- 2-7. 입력 파일 감시와 지오코딩 진행 표시 ---
+# 몇 초마다 입력 파일 버전을 확인해, 바뀐 파일이 있을 때만 전체 화면을 다시 그린다.
+WATCH_INTERVAL_SECONDS = 5
+
+
+@st.fragment(run_every=WATCH_INTERVAL_SECONDS)
+def watch_input_files(versions):
+    if changed_files(versions):
+        st.rerun(scope="app")
+
+
+# 시트를 다시 가공한 경우 추가/변경/삭제된 행 수를 세션마다 한 번 알린다.
+def announce_snapshot_diff(df):
+    diff = df.attrs.get('snapshot_diff') if df is not None else None
+    if not diff or 'added' not in diff: return
+    announced = st.session_state.setdefault('announced_versions', set())
+    data_version = df.attrs.get('data_version')
+    if data_version in announced: return
+    announced.add(data_version)
+    st.toast(f"📥 {data_version.split('-v')[0]} 데이터 갱신: 추가 {diff['added']}, "
+             f"변경 {diff['changed']}, 삭제 {diff['removed']} "
+             f"(다시 가공한 행 {diff['reparsed']}/{diff['rows']})")
+
+
+# 몇 초마다 작업 상태를 확인해 새 좌표가 들어왔을 때만 전체 화면을 다시 그린다.
+@st.fragment(run_every=3)
+def show_geocoding_progress(job):
+    st.caption(f"📍 주소 좌표 변환 중... ({job.completed}/{job.total})")
+    if job.finished or job.completed != st.session_state.geocoded_count:
+        st.rerun(scope="app")
+
+
+# --- 2-8. 기본 지도와 오버레이 ---
+# 기본 지도(타일 레이어)는 항상 같은 값으로 만들어 세션 내내 같은 스크립트가 되게 한다.
+# streamlit-folium은 기본 지도 스크립트와 key가 같으면 브라우저의 지도를 그대로 두고
+# 오버레이(feature group)만 바꿔 끼우므로, 다시 그릴 때 타일과 화면 시점이 초기화되지 않는다.
+# 오버레이는 항상 같은 이름과 순서로 넘기고 요소 id를 고정해 두어, 입력이 같은 오버레이는
+# 스크립트도 같으므로 브라우저는 오버레이 스크립트가 바뀐 경우에만 다시 그린다.
+MAP_KEY = 'dashboard_map'
+
+
+# 팝업 내용 표(JSON)도 데이터 버전마다 한 번만 만든다.
+@st.cache_resource(max_entries=4)
+def get_popup_table_json(data_version, _df, fields):
+    return build_popup_table(_df, fields)
+
+
+# --- 2-9. 클러스터 영역 ---
+# '클러스터.geojson' 파일이 있으면 그 다각형을, 없으면 기본 영역을 쓴다.
+# 국소/진행 현황 좌표의 클러스터 배정은 데이터와 영역 버전마다 한 번만 계산한다.
+CLUSTER_COLUMN = '클러스터'
+
+
+@st.cache_data
+def load_cluster_geojson(filename, version):
+    return loaders.load_cluster_geojson(filename, report=st.error)
+
+
+@st.cache_resource(max_entries=2)
+def get_cluster_index(cluster_version, _geojson):
+    return freeze(ClusterIndex(_geojson))
+
+
+@st.cache_resource(max_entries=8)
+def get_cluster_labels(data_key, cluster_version, _cluster_index, _lat, _lon):
+    return freeze(_cluster_index.labels(_lat, _lon))
+
+
+# --- 2-10. 단계별 성능 기록 ---
+# 단계별 최근 소요 시간은 모든 세션이 함께 모아 p50/p95를 낸다.
+@st.cache_resource
+def get_stage_metrics():
+    return StageMetrics()
+
+
+def show_debug_panel(trace, metrics):
+    with st.sidebar.expander("🛠 단계별 성능", expanded=True):
+        st.caption(f"이번 실행: {trace.total_ms:,.0f} ms")
+        st.dataframe(pd.DataFrame(trace.records).round(1), hide_index=True)
+        st.caption("최근 실행 기준 (모든 세션)")
+        st.dataframe(pd.DataFrame(metrics.summary()), hide_index=True)
 
 
 # --- 3. 메인 대시보드 함수 ---
+# 단계별 소요 시간, 캐시 적중 여부, 그린 요소 수와 전송 용량을 기록한다.
+# 버튼이나 지도 이동으로 st.rerun()이 중간에 끊은 실행도 결과('rerun')를 붙여 기록한다.
 def show_dashboard():
+    trace = RunTrace()
+    outcome = 'error'
+    try:
+        debug_panel = render_dashboard(trace)
+        outcome = 'ok'
+    except RerunException:
+        outcome = 'rerun'
+        raise
+    except StopException:
+        outcome = 'stopped'
+        raise
+    finally:
+        metrics = get_stage_metrics()
+        trace.finish(metrics, outcome=outcome)
+    if debug_panel:
+        show_debug_panel(trace, metrics)
+
+
+def render_dashboard(trace):
     st.title("🗺️ 유선 가평재난 대응 대시보드")
 
-    geojson_data = {
-        "type":
-        "FeatureCollection",
-        "features": [{
-            "type": "Feature",
-            "properties": {},
-            "geometry": {
-                "coordinates": [[[127.2806953180476, 37.78729788838481],
-                                 [127.2765499549609, 37.7771712447948],
-                                 [127.29576936563382, 37.774788303497445],
-                                 [127.34852853218655, 37.79280739100005],
-                                 [127.37641552022086, 37.7916161819997],
-                                 [127.3538044488406, 37.812906146199694],
-                                 [127.3129160947625, 37.81007776322896],
-                                 [127.28917446981495, 37.804867300456266],
-                                 [127.2806953180476, 37.78729788838481]]],
-                "type":
-                "Polygon"
-            }
-        }, {
-            "type": "Feature",
-            "properties": {},
-            "geometry": {
-                "coordinates": [[[127.30114246707063, 37.83937277697714],
-                                 [127.30281667537503, 37.826645709902834],
-                                 [127.32939473223814, 37.81705763830212],
-                                 [127.34174201849481, 37.82350492707792],
-                                 [127.34153274245756, 37.83986859229668],
-                                 [127.32855762808498, 37.85110617888827],
-                                 [127.30825785237084, 37.8494537000242],
-                                 [127.30114246707063, 37.83937277697714]]],
-                "type":
-                "Polygon"
-            }
-        }, {
-            "type": "Feature",
-            "properties": {},
-            "geometry": {
-                "coordinates": [[[127.35785627344296, 37.840860212937045],
-                                 [127.3553449609833, 37.83176985807101],
-                                 [127.3685293513953, 37.828959885397154],
-                                 [127.40285062167248, 37.84119075018792],
-                                 [127.41122166320247, 37.85837664589687],
-                                 [127.4055712101694, 37.8720894383471],
-                                 [127.36978500762501, 37.870272226993634],
-                                 [127.35283364852381, 37.8514366702168],
-                                 [127.35785627344296, 37.840860212937045]]],
-                "type":
-                "Polygon"
-            }
-        }, {
-            "type": "Feature",
-            "properties": {},
-            "geometry": {
-                "coordinates": [[[127.38208718030882, 37.789871082070206],
-                                 [127.38456298052728, 37.77337845393433],
-                                 [127.3948198671464, 37.75939876981431],
-                                 [127.41674838336314, 37.76694812744792],
-                                 [127.41922418358149, 37.79406353636617],
-                                 [127.3891608952186, 37.82312467645714],
-                                 [127.36369552154696, 37.81362517748403],
-                                 [127.38208718030882, 37.789871082070206]]],
-                "type":
-                "Polygon"
-            }
-        }, {
-            "type": "Feature",
-            "properties": {},
-            "geometry": {
-                "coordinates": [[[127.51803924542475, 37.83135101098242],
-                                 [127.51825739118652, 37.842377117042346],
-                                 [127.51324003864227, 37.8523681020244],
-                                 [127.49622466914303, 37.868385304016414],
-                                 [127.4678657199762, 37.87837276434155],
-                                 [127.45630399454893, 37.86804088468334],
-                                 [127.44365154030442, 37.8523681020244],
-                                 [127.44801445556118, 37.83307394869125],
-                                 [127.48095446574649, 37.81963396756811],
-                                 [127.51803924542475, 37.83135101098242]]],
-                "type":
-                "Polygon"
-            }
-        }]
-    }
-
     st.sidebar.title("⚙️ 앱 관리")
-    if st.sidebar.button("🔄 데이터 새로고침", help="엑셀 파일 변경 사항을 앱에 반영합니다."):
-        st.cache_data.clear()
+    # 입력 파일별 버전. 로더에 넘겨 바뀐 파일을 읽는 로더만 다시 실행되게 한다.
+    input_versions = {
+        filename: file_version(filename)
+        for filename in ("광케이블가평.xlsx", "복구미복구국소.xlsx", "진행현황.xlsx",
+                         CLUSTER_FILE)
+    }
+    if st.sidebar.button("🔄 데이터 새로고침", help="변경된 엑셀 파일만 다시 읽어 앱에 반영합니다."):
         st.rerun()
+    if st.sidebar.toggle("파일 변경 자동 반영",
+                         value=True,
+                         help=f"{WATCH_INTERVAL_SECONDS}초마다 엑셀 파일이 바뀌었는지 확인합니다."):
+        with st.sidebar:
+            watch_input_files(input_versions)
+    # DASHBOARD_DEBUG_PANEL=1이면 처음부터 켜 둔다. (벤치마크 실행 등)
+    debug_panel = st.sidebar.toggle(
+        "🛠 성능 디버그 패널",
+        value=os.environ.get('DASHBOARD_DEBUG_PANEL') == '1')
     st.sidebar.markdown("---")
 
     # [수정] 세션 상태 초기화를 위해 데이터 로딩을 먼저 수행
-    df_cable = load_cable_data("광케이블가평.xlsx")
-    df_recovery = load_recovery_status_data("복구미복구국소.xlsx")
-    df_progress = load_progress_data("진행현황.xlsx")
-    df_repeater = load_repeater_recovery_data("진행현황.xlsx")
+    trace.lap('시작')
+    df_cable, cable_coords = view(
+        trace.call('로딩: 광케이블', load_cable_data, "광케이블가평.xlsx",
+                   input_versions["광케이블가평.xlsx"])) or (None, None)
+    cable_pyramid, cable_index = None, None
+    if df_cable is not None:
+        cable_pyramid = get_cable_pyramid(df_cable.attrs.get('data_version'),
+                                          df_cable, cable_coords)
+        cable_index = get_cable_index(df_cable.attrs.get('data_version'),
+                                      cable_coords)
+    trace.lap('광케이블 단순화/인덱스')
+    df_recovery = view(
+        trace.call('로딩: 복구 국소', load_recovery_status_data, "복구미복구국소.xlsx",
+                   input_versions["복구미복구국소.xlsx"]))
+    df_progress = view(
+        trace.call('로딩: 진행 현황', load_progress_data, "진행현황.xlsx",
+                   input_versions["진행현황.xlsx"]))
+    df_progress_map = view(
+        trace.call('로딩: 진행 현황 지도', load_progress_map_data, "진행현황.xlsx",
+                   input_versions["진행현황.xlsx"]))
+    df_repeater = view(
+        trace.call('로딩: 중계기 현황', load_repeater_recovery_data, "진행현황.xlsx",
+                   input_versions["진행현황.xlsx"]))
+    cluster_geojson, cluster_version = load_cluster_geojson(
+        CLUSTER_FILE, input_versions[CLUSTER_FILE])
+    for df in (df_recovery, df_progress_map):
+        announce_snapshot_diff(df)
+    cluster_index = get_cluster_index(cluster_version, cluster_geojson)
+
+    popup_tables = {}
+    if df_recovery is not None:
+        popup_tables['recovery'] = get_popup_table_json(
+            df_recovery.attrs.get('data_version'), df_recovery,
+            RECOVERY_POPUP_FIELDS)
+    if df_progress_map is not None:
+        popup_tables['progress'] = get_popup_table_json(
+            df_progress_map.attrs.get('data_version'), df_progress_map,
+            progress_popup_fields(df_progress_map))
+        df_progress_map = df_progress_map.assign(
+            **{
+                CLUSTER_COLUMN:
+                get_cluster_labels(df_progress_map.attrs.get('data_version'),
+                                   cluster_version, cluster_index,
+                                   df_progress_map['latitude_dd'].to_numpy(),
+                                   df_progress_map['longitude_dd'].to_numpy())
+            })
+
+    trace.lap('팝업 표/클러스터 배정')
+
+    # 주소 기반 좌표는 백그라운드 지오코딩이 채우는 대로 반영한다.
+    # DMS 좌표가 있는 국소는 지오코딩을 기다리지 않고 바로 표시된다.
+    geocoding_job = None
+    if df_recovery is not None:
+        address_keys = tuple(df_recovery['geocode_key'].dropna().unique())
+        if address_keys:
+            geocoding_job = start_geocoding_job(address_keys)
+            # 재시도까지 실패한 주소가 남은 작업은 버려, 다음 실행에서 새 작업이 다시 조회한다.
+            if geocoding_job.finished and geocoding_job.failed:
+                start_geocoding_job.clear(address_keys)
+        df_recovery = attach_geocoded_coords(
+            df_recovery, geocoding_job.results if geocoding_job else {})
+    if geocoding_job is not None and not geocoding_job.finished:
+        st.session_state.geocoded_count = geocoding_job.completed
+        show_geocoding_progress(geocoding_job)
+    trace.lap('지오코딩',
+              geocoded=geocoding_job.completed if geocoding_job else 0,
+              addresses=geocoding_job.total if geocoding_job else 0)
 
     # [수정] 점검 내역 전체 목록을 미리 준비
+    # 필터 선택지와 필터 결과는 데이터 버전별 비트맵 인덱스에서 가져온다.
     inspection_options = []
+    recovery_filters = None
     if df_recovery is not None:
-        INSPECTION_COL = '점검내역(정전/선로불량/유니트)'
-        if INSPECTION_COL in df_recovery.columns:
-            inspection_options = sorted([
-                str(item)
-                for item in df_recovery[INSPECTION_COL].dropna().unique()
-            ])
+        recovery_key = (df_recovery.attrs.get('data_version'),
+                        int(df_recovery['geocoded_lat'].notna().sum()))
+        recovery_filters = get_recovery_filter_index(recovery_key, df_recovery)
+        df_recovery = df_recovery.assign(
+            **{
+                CLUSTER_COLUMN:
+                get_cluster_labels(recovery_key, cluster_version,
+                                   cluster_index, *station_latlon(df_recovery))
+            })
+        inspection_options = recovery_filters.options(
+            '점검내역(정전/선로불량/유니트)', sort=True)
 
     # [수정] 세션 상태 초기화
     if 'show_cable_by_emd' not in st.session_state:
@@ -271,6 +453,17 @@ def show_dashboard():
         st.session_state.inspection_filter = inspection_options
     if 'show_clusters' not in st.session_state:
         st.session_state.show_clusters = False
+    if 'proximity_m' not in st.session_state:
+        st.session_state.proximity_m = 200
+    if 'map_view' not in st.session_state:
+        st.session_state.map_view = {
+            'center': MAP_CENTER,
+            'zoom': MAP_ZOOM,
+            'window': None
+        }
+    cable_tier = lod_tier_for_zoom(st.session_state.map_view['zoom'])
+
+    trace.lap('필터 인덱스')
 
     # 테이블 정보 표시
     with st.expander("📜 진행 현황 상세 정보 보기", expanded=False):
@@ -317,8 +510,7 @@ def show_dashboard():
         RECOVERY_STATUS_COL = '복구상태'
         INSPECTION_COL = '점검내역(정전/선로불량/유니트)'
         if RECOVERY_STATUS_COL in df_recovery.columns:
-            status_options = list(
-                df_recovery[RECOVERY_STATUS_COL].dropna().unique())
+            status_options = recovery_filters.options(RECOVERY_STATUS_COL)
             valid_defaults = [
                 d for d in st.session_state.recovery_status_filter
                 if d in status_options
@@ -338,11 +530,30 @@ def show_dashboard():
                 st.session_state.inspection_filter = inspection_options
                 st.rerun()
 
+        if df_cable is not None:
+            st.session_state.proximity_m = st.sidebar.slider(
+                "광케이블 근접 기준 (m)",
+                min_value=50,
+                max_value=2000,
+                value=st.session_state.proximity_m,
+                step=50,
+                help="이 거리 안에 광케이블이 있는 국소를 지도에 보라색 테두리로 표시합니다.")
+
     st.sidebar.markdown("---")
     st.sidebar.header("🗺️ 지도 레이어")
     if st.sidebar.button("클러스터 보기/숨기기"):
         st.session_state.show_clusters = not st.session_state.show_clusters
         st.rerun()
+    if cable_pyramid is not None:
+        with st.sidebar.expander("📐 광케이블 단순화 단계"):
+            st.dataframe(pd.DataFrame([{
+                '단계': f"줌 ≤ {tier}" if tier is not None else "원본",
+                '허용오차(m)': round(info['tolerance_m'], 1),
+                '점 개수': info['vertices'],
+                '용량(KB)': round(info['bytes'] / 1024, 1),
+                '사용 중': '✔' if tier == cable_tier else '',
+            } for tier, info in cable_pyramid.items()]),
+                         hide_index=True)
 
     st.sidebar.markdown("---")
     st.sidebar.header("↔️ 지도 크기 조절")
@@ -371,6 +582,7 @@ def show_dashboard():
     <div class="legend-item"><div class="legend-line" style="background-color:red;"></div><span>광케이블</span></div>
     <div class="legend-item"><div class="legend-color" style="background-color:blue; border-radius: 50%;"></div><span>국소 (복구)</span></div>
     <div class="legend-item"><div class="legend-color" style="background-color:red; border: 2px solid yellow; border-radius: 50%;"></div><span>국소 (미복구)</span></div>
+    <div class="legend-item"><div class="legend-color" style="background-color:red; border: 2px solid #8a2be2; border-radius: 50%;"></div><span>국소 (광케이블 근접)</span></div>
     <hr style="margin: 8px 0;">
     <div class="legend-item"><span class="legend-icon">📡</span><span>이동기지국</span></div>
     <div class="legend-item"><div class="legend-color pulsing-dot" style="background-color:#9370DB;"></div><span>작업완료</span></div>
@@ -380,150 +592,137 @@ def show_dashboard():
     """
     st.sidebar.markdown(legend_html_sidebar, unsafe_allow_html=True)
 
+    trace.lap('사이드바/표')
+
     # 지도 생성
-    map_center = [37.8313, 127.5095]
-    m = folium.Map(location=map_center, zoom_start=11)
-    folium.TileLayer('CartoDB positron', name='일반 지도').add_to(m)
-    folium.TileLayer(
-        'https://server.arcgisonline.com/ArcGIS/rest/services/World_Imagery/MapServer/tile/{z}/{y}/{x}',
-        attr='Esri',
-        name='위성 지도').add_to(m)
+    # 오버레이에는 화면 범위에 여유를 더한 창(window) 안의 케이블과 국소만 싣는다.
+    # 창과 단순화 단계는 줌이 다른 단계로 넘어가거나 화면이 창 밖으로 나갈 때만 갱신하고,
+    # 그때도 바뀐 오버레이만 새로 만든다. 기본 지도는 다시 만들지 않으므로 시점이 유지된다.
+    MAP_WIDTH_PX_ESTIMATE = 1600
+    map_view = st.session_state.map_view
+    if map_view['window'] is None:
+        map_view['window'] = expand_bbox(
+            estimate_view_bbox(map_view['center'], map_view['zoom'],
+                               MAP_WIDTH_PX_ESTIMATE, map_height))
+    window = map_view['window']
+    m = build_base_map(popup_tables)
+    overlays = overlay_groups()
 
     if st.session_state.show_clusters:
-        style_function = lambda x: {
-            'fillColor': 'yellow',
-            'color': 'orange',
-            'weight': 2,
-            'fillOpacity': 0.3
-        }
-        folium.GeoJson(geojson_data,
-                       name='클러스터 영역',
-                       style_function=style_function).add_to(m)
-
-    if st.session_state.view_all_cables and df_cable is not None:
-        for _, row in df_cable.iterrows():
-            folium.PolyLine(locations=row['parsed_coords'],
-                            color='red',
-                            weight=2.5,
-                            tooltip='광케이블').add_to(m)
-    elif st.session_state.selected_emds and df_cable is not None:
-        filtered_df_cable = df_cable[df_cable['읍면동명'].isin(
-            st.session_state.selected_emds)]
-        for _, row in filtered_df_cable.iterrows():
-            folium.PolyLine(locations=row['parsed_coords'],
-                            color='red',
-                            weight=2.5,
-                            tooltip=row.get('읍면동명', '광케이블')).add_to(m)
+        add_cluster_areas(cluster_geojson, overlays['클러스터 영역'])
+
+    # 광케이블은 현재 줌에 맞는 단계에서 창 안에 걸친 케이블 중 보여줄 것만 골라 붙인다.
+    overlay_bytes, cable_count, station_count, progress_count = 0, 0, 0, 0
+    show_cables = cable_pyramid is not None and (
+        st.session_state.view_all_cables or bool(st.session_state.selected_emds))
+    if show_cables:
+        cable_json = get_cable_overlay_json(
+            df_cable.attrs.get('data_version'), cable_tier, window,
+            None if st.session_state.view_all_cables else tuple(
+                st.session_state.selected_emds), df_cable, cable_pyramid,
+            cable_index)
+        if cable_json is not None:
+            overlay_bytes += len(cable_json)
+            cable_count = cable_json.count('"LineString"')
+            PrebuiltGeoJson(cable_json, style=CABLE_STYLE,
+                            control=False).add_to(overlays['광케이블'])
+
+    # 국소별 가장 가까운 광케이블 (번호, 거리 m). 케이블이 검색 반경 밖이면 (-1, NaN).
+    cable_nearest, cable_distance = None, None
+    if df_recovery is not None:
+        station_lat, station_lon = station_latlon(df_recovery)
+        if df_cable is not None:
+            cable_nearest, cable_distance = get_station_cable_distances(
+                df_recovery.attrs.get('data_version'),
+                df_cable.attrs.get('data_version'),
+                get_cable_proximity(df_cable.attrs.get('data_version'),
+                                    cable_coords)).update(
+                                        df_recovery.index, station_lat,
+                                        station_lon)
+        recovery_index = get_station_index(recovery_key, station_lat,
+                                           station_lon)
+        # 점검 내역 필터가 비어 있으면 점검 내역으로는 거르지 않는다.
+        filter_mask = recovery_filters.mask(
+            (('복구상태', st.session_state.recovery_status_filter),
+             ('점검내역(정전/선로불량/유니트)', st.session_state.inspection_filter
+              or None)))
+        visible_mask = recovery_index.mask(window) & filter_mask
+        filtered_df_recovery = df_recovery[visible_mask]
+
+        marker_json = recovery_marker_data(
+            filtered_df_recovery,
+            None if cable_distance is None else
+            cable_distance[visible_mask] <= st.session_state.proximity_m)
+        overlay_bytes += len(marker_json)
+        station_count = len(filtered_df_recovery)
+        recovery_marker_layer(marker_json).add_to(overlays['국소'])
+
+    if df_progress_map is not None:
+        progress_index = get_station_index(
+            df_progress_map.attrs.get('data_version'),
+            df_progress_map['latitude_dd'].to_numpy(),
+            df_progress_map['longitude_dd'].to_numpy())
+        visible_progress = df_progress_map[progress_index.mask(window)]
+        marker_json = progress_marker_data(visible_progress)
+        overlay_bytes += len(marker_json)
+        progress_count = len(visible_progress)
+        progress_marker_layer(marker_json).add_to(overlays['진행 현황'])
+
+    trace.lap('지도 구성',
+              cables=cable_count,
+              stations=station_count,
+              progress=progress_count,
+              overlay_kb=overlay_bytes / 1024)
+    # 기본 지도 HTML 크기는 디버그 패널을 켰을 때만 따로 렌더링해 잰다.
+    if debug_panel:
+        trace.lap('HTML 직렬화',
+                  base_html_kb=len(m.get_root().render().encode()) / 1024)
+
+    map_data = st_folium(
+        m,
+        key=MAP_KEY,
+        width='100%',
+        height=map_height,
+        returned_objects=['last_clicked', 'zoom', 'center', 'bounds'],
+        feature_group_to_add=[
+            with_stable_ids(group, f"overlay{i}")
+            for i, group in enumerate(overlays.values())
+        ],
+        layer_control=folium.LayerControl())
+    trace.lap('st_folium 전송')
+
+    # 줌이 다른 단순화 단계로 넘어가거나 화면이 창 밖으로 나가면 현재 화면 기준으로 창을 옮기고
+    # 오버레이를 다시 만든다.
+    if map_data and map_data.get('zoom') is not None and map_data.get(
+            'center') and map_data.get('bounds'):
+        south_west = map_data['bounds'].get('_southWest') or {}
+        north_east = map_data['bounds'].get('_northEast') or {}
+        view_bbox = (south_west.get('lat'), south_west.get('lng'),
+                     north_east.get('lat'), north_east.get('lng'))
+        if None not in view_bbox:
+            tier_changed = show_cables and lod_tier_for_zoom(
+                map_data['zoom']) != cable_tier
+            if tier_changed or not bbox_contains(window, view_bbox):
+                st.session_state.map_view = {
+                    'center':
+                    [map_data['center']['lat'], map_data['center']['lng']],
+                    'zoom': map_data['zoom'],
+                    'window': expand_bbox(view_bbox)
+                }
+                st.rerun()
 
+    # 지표는 모두 집계 큐브에서 찾는다.
+    recovery_cube = None
     if df_recovery is not None:
-        filtered_df_recovery = df_recovery[df_recovery['복구상태'].isin(
-            st.session_state.recovery_status_filter)]
-        if st.session_state.inspection_filter and '점검내역(정전/선로불량/유니트)' in filtered_df_recovery.columns:
-            filtered_df_recovery = filtered_df_recovery[
-                filtered_df_recovery['점검내역(정전/선로불량/유니트)'].astype(str).isin(
-                    st.session_state.inspection_filter)]
-
-        color_map = {'복구': 'blue', '미복구': 'red'}
-        for _, row in filtered_df_recovery.iterrows():
-            lat = row['geocoded_lat'] if pd.notna(
-                row['geocoded_lat']) else row['latitude_dd']
-            lon = row['geocoded_lon'] if pd.notna(
-                row['geocoded_lon']) else row['longitude_dd']
-
-            if pd.notna(lat) and pd.notna(lon):
-                status = row.get('복구상태', '정보 없음')
-                coord_source = "주소기반" if pd.notna(
-                    row['geocoded_lat']) else "엑셀좌표(DMS)"
-                popup_info = [
-                    f"<b>국소명:</b> {row.get('국소명', '정보 없음')}",
-                    f"<b>주소:</b> {row.get('주소', '정보 없음')}",
-                    f"<b>복구 상태:</b> {status}",
-                    f"<b>장비 종류:</b> {row.get('RU / 중계기=>중계기 종류', '정보 없음')}",
-                    f"<b>공동망 구분:</b> {row.get('공동망구분', '정보 없음')}",
-                    f"<b>점검 내역:</b> {row.get('점검내역(정전/선로불량/유니트)', '정보 없음')}",
-                    f"<b>위치정보 소스:</b> {coord_source}"
-                ]
-                popup_html = "<br>".join(popup_info)
-                border_color = 'yellow' if status == '미복구' else 'white'
-
-                folium.CircleMarker(location=[lat, lon],
-                                    radius=7,
-                                    color=border_color,
-                                    weight=2,
-                                    fill=True,
-                                    fill_color=color_map.get(status, 'gray'),
-                                    fill_opacity=1.0,
-                                    popup=folium.Popup(
-                                        popup_html, max_width=300)).add_to(m)
-
-    if df_progress is not None:
-        df_progress_map = df_progress.copy()
-
-        def parse_latlon_string(text):
-            if not isinstance(text, str): return None
-            try:
-                lat, lon = map(float, text.split(','))
-                return [lat, lon]
-            except (ValueError, IndexError):
-                return None
-
-        COORD_COL = '위경도'
-        if COORD_COL in df_progress_map.columns:
-            df_progress_map['parsed_coords'] = df_progress_map[
-                COORD_COL].apply(parse_latlon_string)
-            df_progress_map.dropna(subset=['parsed_coords'], inplace=True)
-
-            for _, row in df_progress_map.iterrows():
-                popup_info = [
-                    f"<b>{k}:</b> {v}" for k, v in row.items()
-                    if k not in ['parsed_coords', '위경도']
-                ]
-                popup_html = "<br>".join(popup_info)
-                division = str(row.get('구분', ""))
-                status = row.get('진행여부')
-                icon = None
-                if '이동기지국' in division:
-                    icon = folium.DivIcon(
-                        html='<div style="font-size: 24px;">📡</div>',
-                        icon_size=(30, 30),
-                        icon_anchor=(15, 15))
-                else:
-                    pulsing_icon_colors = {
-                        '현장확인': '#28a745',
-                        '작업완료': '#9370DB',
-                        '진행중': '#007bff'
-                    }
-                    color = pulsing_icon_colors.get(status)
-                    if color:
-                        pulsing_icon_html = f"""<div style="width:24px;height:24px;border-radius:50%;background-color:{color};border:2px solid white;box-shadow:0 0 8px {color};animation:pulse_{status} 1.5s infinite;position:relative;top:-12px;left:-12px;"></div><style>@keyframes pulse_{status}{{0%{{transform:scale(0.8);box-shadow:0 0 0 0 {color}aa}}70%{{transform:scale(1.2);box-shadow:0 0 10px 10px {color}00}}100%{{transform:scale(0.8);box-shadow:0 0 0 0 {color}00}}}}</style>"""
-                        icon = folium.DivIcon(html=pulsing_icon_html,
-                                              icon_size=(24, 24),
-                                              icon_anchor=(12, 12))
-                    else:
-                        icon = folium.Icon(color='gray', icon='info-sign')
-                folium.Marker(location=row['parsed_coords'],
-                              popup=folium.Popup(popup_html, max_width=400),
-                              icon=icon).add_to(m)
-
-    folium.LayerControl().add_to(m)
-    map_data = st_folium(m,
-                         width='100%',
-                         height=map_height,
-                         returned_objects=['last_clicked'])
+        recovery_cube = get_recovery_cube(recovery_key, cluster_version,
+                                          df_recovery)
 
     with st.expander("📊 가평 전체 국소 현황 보기", expanded=False):
         col1, col2, col3, col4 = st.columns(4)
         total_count, recovered_count, unrecovered_count, recovery_rate = 0, 0, 0, 0.0
-        if df_recovery is not None:
-            RECOVERY_STATUS_COL = '복구상태'
-            total_count = len(df_recovery)
-            if RECOVERY_STATUS_COL in df_recovery.columns and total_count > 0:
-                recovered_count = len(
-                    df_recovery[df_recovery[RECOVERY_STATUS_COL] == '복구'])
-                unrecovered_count = len(
-                    df_recovery[df_recovery[RECOVERY_STATUS_COL] == '미복구'])
-                recovery_rate = (recovered_count /
-                                 total_count) * 100 if total_count > 0 else 0
+        if recovery_cube is not None:
+            total_count, recovered_count, unrecovered_count, recovery_rate = (
+                recovery_cube.recovery_summary('복구상태'))
         col1.metric(label="총 국소", value=total_count)
         col2.metric(label="복구", value=recovered_count)
         col3.metric(label="미복구", value=unrecovered_count)
@@ -532,40 +731,104 @@ def show_dashboard():
     with st.expander("📊 유선 RM 복구 현황 보기", expanded=False):
         col5, col6, col7, col8 = st.columns(4)
         rm_total, rm_recovered, rm_unrecovered, rm_recovery_rate = 0, 0, 0, 0.0
-        if df_recovery is not None:
-            RECOVERY_STATUS_COL = '복구상태'
+        if recovery_cube is not None:
             INSPECTION_COL = '점검내역(정전/선로불량/유니트)'
-            if INSPECTION_COL in df_recovery.columns:
+            if INSPECTION_COL in recovery_cube:
                 target_inspections = ['선로불량', '정전/선로불량']
-                # isin()은 문자열 비교를 기본으로 하므로 .astype(str)로 안전하게 변환
-                df_rm_special = df_recovery[df_recovery[INSPECTION_COL].astype(
-                    str).isin(target_inspections)]
-                rm_total = len(df_rm_special)
-                if rm_total > 0:
-                    rm_recovered = len(df_rm_special[
-                        df_rm_special[RECOVERY_STATUS_COL] == '복구'])
-                    rm_unrecovered = len(df_rm_special[
-                        df_rm_special[RECOVERY_STATUS_COL] == '미복구'])
-                    rm_recovery_rate = (rm_recovered /
-                                        rm_total) * 100 if rm_total > 0 else 0
+                rm_total, rm_recovered, rm_unrecovered, rm_recovery_rate = (
+                    recovery_cube.recovery_summary(
+                        '복구상태', {INSPECTION_COL: target_inspections}))
         col5.metric(label="총 대상", value=rm_total)
         col6.metric(label="복구", value=rm_recovered)
         col7.metric(label="미복구", value=rm_unrecovered)
         col8.metric(label="복구율 (%)", value=f"{rm_recovery_rate:.1f} %")
 
+    # 클러스터별 복구 현황(집계 큐브)과 진행 현황 개수
+    with st.expander("📊 클러스터별 복구 현황 보기", expanded=False):
+        if recovery_cube is not None and CLUSTER_COLUMN in recovery_cube:
+            # 클러스터 x 복구상태 개수 표를 한 번에 만들고 클러스터별로 합친다.
+            counts = recovery_cube.breakdown(
+                [CLUSTER_COLUMN] +
+                (['복구상태'] if '복구상태' in recovery_cube else []))
+            counts = (counts.unstack(fill_value=0) if counts.index.nlevels > 1
+                      else counts.to_frame()).reindex(cluster_index.names,
+                                                      fill_value=0)
+            zeros = pd.Series(0, index=counts.index)
+            total = counts.sum(axis=1)
+            recovered = counts.get('복구', zeros)
+            rate = (recovered / total.where(total > 0) * 100).fillna(0.0)
+            st.dataframe(pd.DataFrame({
+                '총 국소': total,
+                '복구': recovered,
+                '미복구': counts.get('미복구', zeros),
+                '복구율 (%)': rate.round(1)
+            }).rename_axis('클러스터').reset_index(),
+                         use_container_width=True,
+                         hide_index=True)
+            if df_progress_map is not None and '진행여부' in df_progress_map.columns:
+                st.caption("클러스터별 진행 현황")
+                st.dataframe(pd.crosstab(df_progress_map[CLUSTER_COLUMN],
+                                         df_progress_map['진행여부']),
+                             use_container_width=True)
+        else:
+            st.info("국소 데이터가 없습니다.")
+
+    # 미복구 국소 중 가까운 광케이블이 기준 거리 안에 있는 국소와, 그 케이블의 읍면동별 개수
+    with st.expander("🔌 광케이블 근접 미복구 국소 보기", expanded=False):
+        if cable_distance is not None and '복구상태' in df_recovery.columns:
+            proximity_m = st.session_state.proximity_m
+            near = ((df_recovery['복구상태'].astype(object) == '미복구').to_numpy()
+                    & (cable_distance <= proximity_m))
+            station_columns = [
+                column
+                for column in ['국소명', '주소', '지역', 'RU / 중계기=>중계기 종류',
+                               '점검내역(정전/선로불량/유니트)']
+                if column in df_recovery.columns
+            ]
+            df_near = df_recovery.loc[near, station_columns].assign(
+                **{
+                    '가까운 광케이블 읍면동':
+                    df_cable[EMD_COLUMN].iloc[cable_nearest[near]].to_numpy()
+                    if EMD_COLUMN in df_cable.columns else None,
+                    '케이블까지 거리(m)': cable_distance[near].round(1)
+                }).sort_values('케이블까지 거리(m)')
+            st.caption(f"광케이블 {proximity_m}m 이내 미복구 국소: {len(df_near)}개")
+            if len(df_near):
+                col1, col2 = st.columns([3, 1])
+                col1.dataframe(df_near, use_container_width=True, hide_index=True)
+                col2.dataframe(
+                    df_near['가까운 광케이블 읍면동'].value_counts().rename_axis(
+                        '읍면동').reset_index(name='미복구 국소 수'),
+                    use_container_width=True,
+                    hide_index=True)
+        else:
+            st.info("광케이블 또는 국소 데이터가 없습니다.")
+
+    # 클릭 위치가 바뀐 경우에만 주소를 찾고, 다른 위젯 때문에 다시 그릴 때는 지난 결과를 쓴다.
     with st.expander("🌐 선택 위치 주소 보기", expanded=False):
         if map_data and map_data.get("last_clicked"):
-            lat, lng = map_data["last_clicked"]["lat"], map_data[
-                "last_clicked"]["lng"]
-            geolocator = Nominatim(user_agent="gapyeong_dashboard_app")
-            try:
-                location = geolocator.reverse((lat, lng), language="ko")
-                address = location.address if location else "주소를 찾을 수 없습니다."
-                st.success(f"선택한 위치의 주소: {address}")
-            except Exception as e:
-                st.error(f"주소 변환 중 오류가 발생했습니다: {e}")
+            point = (map_data["last_clicked"]["lat"],
+                     map_data["last_clicked"]["lng"])
+            last = st.session_state.get('reverse_geocode')
+            if last is None or last['point'] != point:
+                address, source = get_reverse_geocoder().reverse(
+                    *point,
+                    fallback=get_offline_places(
+                        recovery_key if df_recovery is not None else None,
+                        df_cable.attrs.get('data_version')
+                        if df_cable is not None else None, df_recovery,
+                        df_cable, cable_coords))
+                last = {'point': point, 'address': address, 'source': source}
+                st.session_state.reverse_geocode = last
+            if last['address']:
+                st.success(f"선택한 위치의 주소: {last['address']}")
+                st.caption(f"출처: {last['source']}")
+            else:
+                st.warning("주소를 찾을 수 없습니다.")
         else:
             st.info("지도 위를 클릭하면 해당 위치의 주소가 표시됩니다. 마커를 클릭하면 상세 정보가 나타납니다.")
+    trace.lap('지표/분석 표')
+    return debug_panel
 
 
 if __name__ == "__main__":
@@ -0,0 +1,209 @@
+# --- 규모별 성능 측정 (헤드리스) ---
+# synthetic 모듈로 규모별 입력 엑셀을 만든 뒤, 대시보드를 브라우저 없이(streamlit AppTest)
+# 실행하면서 화면을 그릴 때마다 남는 단계별 기록(instrumentation.RunTrace)을 모은다.
+# 지오코더는 fake 백엔드로 바꿔 네트워크 없이 돌리고, 규모마다 새 프로세스에서 실행해
+# 캐시와 메모리 사용량이 섞이지 않게 한다.
+# 결과는 규모 x 시나리오별 로딩/필터/지도 구성/직렬화 시간(중앙값)을 표로 보여 주고,
+# --output을 주면 실행 한 번마다 한 행씩 CSV로 남겨 이전 결과와 비교할 수 있게 한다.
+#
+#   python benchmark.py --sizes 1000 10000 100000 --output bench.csv
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+import synthetic
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+DEFAULT_SIZES = [1000, 10_000, 100_000]
+DEFAULT_WORKDIR = os.path.join(".cache", "benchmark")
+
+# 보고서에 묶어 보여 줄 단계
+STAGE_GROUPS = {
+    '로딩': lambda stage: stage.startswith('로딩:') or stage == '광케이블 단순화/인덱스',
+    '필터': lambda stage: stage == '필터 인덱스',
+    '지도 구성': lambda stage: stage == '지도 구성',
+    '직렬화': lambda stage: stage in ('HTML 직렬화', 'st_folium 전송'),
+}
+COUNT_FIELDS = ('cables', 'stations', 'progress', 'overlay_kb', 'base_html_kb')
+
+
+def _button(at, label):
+    return next(b for b in at.sidebar.button if b.label == label)
+
+
+def _multiselect(at, label):
+    return next(m for m in at.sidebar.multiselect if m.label == label)
+
+
+# 시나리오 이름과 실행 함수. 각 함수는 AppTest를 받아 화면을 한 번 (다시) 그린다.
+def _scenarios(repeat):
+    steps = [('처음 실행', lambda at: at.run())]
+    steps += [('다시 그리기', lambda at: at.run())] * repeat
+    steps += [
+        ('전체 케이블', lambda at: _button(at, "전체 보기").click().run()),
+        ('미복구 필터',
+         lambda at: _multiselect(at, "복구/미복구 보기").set_value(['미복구']).run()),
+        ('읍면동 보기', lambda at: _button(at, "읍면동별 보기/숨기기").click().run()),
+        ('읍면동 선택', lambda at: _multiselect(at, "읍면동 선택").set_value(
+            _multiselect(at, "읍면동 선택").options[:1]).run()),
+    ]
+    return steps
+
+
+def _read_new_entries(path, offset):
+    if not os.path.exists(path): return [], offset
+    with open(path, encoding='utf-8') as f:
+        f.seek(offset)
+        lines = f.readlines()
+        return [json.loads(line) for line in lines if line.strip()], f.tell()
+
+
+def _summarize(entry):
+    row = {'전체(ms)': entry['total_ms']}
+    for group, matches in STAGE_GROUPS.items():
+        row[f"{group}(ms)"] = round(
+            sum(s['ms'] for s in entry['stages'] if matches(s['stage'])), 2)
+    row['캐시 미스'] = sum(
+        1 for s in entry['stages'] if s.get('cache') == 'miss')
+    for stage in entry['stages']:
+        for field in COUNT_FIELDS:
+            if field in stage: row[field] = stage[field]
+    return row
+
+
+# 자식 프로세스: data_dir에서 대시보드를 시나리오대로 실행하고 실행별 기록을 돌려준다.
+# 처음 실행은 스냅샷 없이 엑셀부터 읽고, 이어서 프로세스 캐시를 비운 뒤 스냅샷으로 다시 읽는다.
+def run_scenarios(data_dir, repeat=3, timeout=1800):
+    from streamlit.testing.v1 import AppTest
+    import streamlit as st
+
+    os.chdir(data_dir)
+    shutil.rmtree(os.path.join(".cache", "snapshots"), ignore_errors=True)
+    log_path = os.environ['DASHBOARD_METRICS_LOG']
+    offset = 0
+    rows = []
+
+    def record(scenario, step):
+        nonlocal offset
+        started = time.perf_counter()
+        step(at)
+        wall_ms = (time.perf_counter() - started) * 1000
+        entries, offset = _read_new_entries(log_path, offset)
+        errors = [str(e.value) for e in at.exception]
+        # 버튼이 st.rerun()을 부르면 중간에 끊긴 실행('rerun')도 기록되므로,
+        # 끝까지 그린 마지막 실행을 요약하고 끊긴 실행 수는 따로 센다.
+        completed = [e for e in entries if e.get('outcome', 'ok') == 'ok']
+        row = {
+            '시나리오': scenario,
+            '벽시계(ms)': round(wall_ms, 2),
+            '중단된 실행': len(entries) - len(completed)
+        }
+        if completed: row.update(_summarize(completed[-1]))
+        if errors: row['오류'] = errors[0]
+        rows.append(row)
+
+    scenarios = _scenarios(repeat)
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    record(*scenarios[0])
+    st.cache_resource.clear()
+    st.cache_data.clear()
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    record('스냅샷 읽기', lambda at: at.run())
+    for scenario, step in scenarios[1:]:
+        try:
+            record(scenario, step)
+        except StopIteration:
+            rows.append({'시나리오': scenario, '오류': '위젯을 찾을 수 없음'})
+    # ru_maxrss는 리눅스에서 KB 단위다.
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    for row in rows:
+        row['최대 메모리(MB)'] = round(peak_mb, 1)
+    return rows
+
+
+def prepare_data(workdir, size, seed=0, regenerate=False):
+    data_dir = os.path.abspath(os.path.join(workdir, str(size)))
+    paths = [os.path.join(data_dir, name)
+             for name in (synthetic.CABLE_FILE, synthetic.RECOVERY_FILE,
+                          synthetic.PROGRESS_FILE)]
+    if regenerate or not all(os.path.exists(p) for p in paths):
+        started = time.perf_counter()
+        synthetic.generate(data_dir, cables=size, stations=size, seed=seed)
+        print(f"[{size:,}] 입력 파일 생성 {time.perf_counter() - started:.1f}s",
+              file=sys.stderr)
+    return data_dir
+
+
+def run_size(data_dir, repeat, timeout):
+    with tempfile.TemporaryDirectory() as tmp:
+        result_path = os.path.join(tmp, "result.json")
+        env = dict(os.environ,
+                   GEOCODER_BACKEND='fake',
+                   DASHBOARD_DEBUG_PANEL='1',
+                   DASHBOARD_METRICS_LOG=os.path.join(tmp, "metrics.jsonl"))
+        proc = subprocess.run([
+            sys.executable,
+            os.path.abspath(__file__), '--child', data_dir, '--result',
+            result_path, '--repeat',
+            str(repeat), '--timeout',
+            str(timeout)
+        ], env=env, capture_output=True, text=True)
+        if proc.returncode != 0:
+            raise RuntimeError(f"벤치마크 실행 실패 ({data_dir}):\n{proc.stderr[-4000:]}")
+        with open(result_path, encoding='utf-8') as f:
+            return json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="대시보드 규모별 성능 측정")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help="케이블/국소 행 수")
+    parser.add_argument('--workdir', default=DEFAULT_WORKDIR,
+                        help="규모별 합성 데이터를 둘 디렉터리")
+    parser.add_argument('--repeat', type=int, default=3,
+                        help="캐시가 찬 상태에서 다시 그리는 횟수")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--regenerate', action='store_true',
+                        help="있는 합성 데이터도 새로 만든다")
+    parser.add_argument('--timeout', type=float, default=1800,
+                        help="화면 한 번 그리기 제한 시간(초)")
+    parser.add_argument('--output', help="실행별 결과 CSV 경로")
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    parser.add_argument('--result', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        rows = run_scenarios(args.child, args.repeat, args.timeout)
+        with open(args.result, 'w', encoding='utf-8') as f:
+            json.dump(rows, f, ensure_ascii=False)
+        return
+
+    rows = []
+    for size in args.sizes:
+        data_dir = prepare_data(args.workdir, size, args.seed, args.regenerate)
+        for row in run_size(data_dir, args.repeat, args.timeout):
+            rows.append({'규모': size, **row})
+        print(f"[{size:,}] 측정 완료", file=sys.stderr)
+
+    df = pd.DataFrame(rows)
+    if args.output:
+        df.to_csv(args.output, index=False, encoding='utf-8-sig')
+    columns = [c for c in df.columns if c.endswith('(ms)') or c == '최대 메모리(MB)']
+    summary = df.groupby(['규모', '시나리오'], sort=False)[columns].median()
+    with pd.option_context('display.width', 200, 'display.max_columns', None):
+        print(summary.round(1).to_string())
+    if '오류' in df.columns and df['오류'].notna().any():
+        print(df.loc[df['오류'].notna(), ['규모', '시나리오', '오류']].to_string(
+            index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# --- 클러스터 영역 (점-다각형 포함 판정) ---
+# GeoJSON의 Polygon/MultiPolygon을 변(edge) 배열로 펼쳐 두고, 국소 좌표 배열을
+# 한 번에 클러스터에 배정한다. 다각형마다 경계 상자 안의 국소만 후보로 골라
+# (국소 격자 인덱스 사용) 후보 국소 x 변 배열에서 반직선 교차 횟수를 한꺼번에 센다.
+# 구멍(내부 링)은 교차 횟수의 홀짝으로 자연히 빠지고, 영역이 겹치면 앞의 클러스터가 우선한다.
+import json
+
+import numpy as np
+
+from spatial_index import GridIndex
+
+# 후보 국소 x 변 배열을 이 칸 수 이하로 나눠 계산한다.
+MAX_PAIRS_PER_BLOCK = 1_000_000
+NAME_PROPERTIES = ('name', '이름', '클러스터', 'id')
+
+
+def read_cluster_geojson(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _polygon_rings(geometry):
+    if not geometry: return []
+    if geometry.get('type') == 'Polygon':
+        return list(geometry.get('coordinates') or [])
+    if geometry.get('type') == 'MultiPolygon':
+        return [
+            ring for polygon in geometry.get('coordinates') or []
+            for ring in polygon
+        ]
+    return []
+
+
+def _feature_name(feature, i):
+    properties = feature.get('properties') or {}
+    for key in NAME_PROPERTIES:
+        if properties.get(key) not in (None, ''):
+            return str(properties[key])
+    return f"클러스터 {i + 1}"
+
+
+class ClusterIndex:
+
+    def __init__(self, geojson):
+        self.names = []
+        self.features = []  # 클러스터별 원래 GeoJSON 피처
+        self.edges = []  # 클러스터별 (m, 4) [lat1, lon1, lat2, lon2]
+        self.bounds = []
+        for feature in (geojson or {}).get('features', []):
+            rings = [
+                np.asarray(ring, dtype=float)[:, :2]
+                for ring in _polygon_rings(feature.get('geometry'))
+                if len(ring) >= 3
+            ]
+            if not rings: continue
+            # GeoJSON 좌표는 [경도, 위도] 순서다.
+            edges = np.vstack([
+                np.column_stack([ring[:, 1], ring[:, 0],
+                                 np.roll(ring[:, 1], -1),
+                                 np.roll(ring[:, 0], -1)]) for ring in rings
+            ])
+            points = np.vstack(rings)
+            self.names.append(_feature_name(feature, len(self.names)))
+            self.features.append(feature)
+            self.edges.append(edges)
+            self.bounds.append((points[:, 1].min(), points[:, 0].min(),
+                                points[:, 1].max(), points[:, 0].max()))
+
+    def __len__(self):
+        return len(self.names)
+
+    # 국소별 클러스터 번호 (어느 영역에도 없으면 -1)
+    def assign(self, lat, lon):
+        lat = np.asarray(lat, dtype=float)
+        lon = np.asarray(lon, dtype=float)
+        cluster = np.full(len(lat), -1, dtype=np.int64)
+        if not len(self) or not len(lat): return cluster
+
+        points = GridIndex.from_points(lat, lon)
+        for i, (edges, bbox) in enumerate(zip(self.edges, self.bounds)):
+            candidates = points.query(bbox)
+            candidates = candidates[cluster[candidates] < 0]
+            if not len(candidates): continue
+            block = max(MAX_PAIRS_PER_BLOCK // len(edges), 1)
+            for start in range(0, len(candidates), block):
+                rows = candidates[start:start + block]
+                inside = _ray_cast(lat[rows], lon[rows], edges)
+                cluster[rows[inside]] = i
+        return cluster
+
+    # 국소별 클러스터 이름 (어느 영역에도 없으면 None)
+    def labels(self, lat, lon):
+        names = np.array(self.names + [None], dtype=object)
+        return names[self.assign(lat, lon)]
+
+
+# 각 점에서 경도 +방향으로 그은 반직선이 변과 몇 번 만나는지 세어 홀수면 안쪽이다.
+def _ray_cast(lat, lon, edges):
+    lat1, lon1, lat2, lon2 = (edges[:, k][None, :] for k in range(4))
+    y = lat[:, None]
+    x = lon[:, None]
+    straddles = (lat1 > y) != (lat2 > y)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cross_lon = lon1 + (y - lat1) * (lon2 - lon1) / (lat2 - lat1)
+    crossings = straddles & (x < cross_lon)
+    return crossings.sum(axis=1) % 2 == 1
@@ -0,0 +1,60 @@
+# --- 좌표 문자열 일괄 변환 ---
+# 엑셀의 DMS 좌표('N 037:45:05.609')와 '위도, 경도' 문자열을 행마다 함수를 부르지 않고
+# Arrow 문자열 연산(정규식 추출, 분할)과 숫자 변환으로 컬럼 전체를 한 번에 변환한다.
+# 결과는 float 배열과 유효 여부 마스크(bool 배열)이며, 변환할 수 없는 칸은 NaN이다.
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+_DMS_PATTERN = r'^(?P<dir>[NSEW])\s*(?P<deg>\d+):(?P<min>\d+):(?P<sec>[\d\.]+)'
+_FLOAT_PATTERN = r'^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$'
+
+
+# 문자열이 아닌 값(숫자, 날짜 등)은 결측으로 취급한다.
+def _as_arrow_strings(values):
+    s = pd.Series(values)
+    if s.dtype != object and not pd.api.types.is_string_dtype(s.dtype):
+        return pa.nulls(len(s), pa.large_string())
+    try:
+        arr = pa.array(s, from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        arr = None
+    if arr is None or not (pa.types.is_string(arr.type)
+                           or pa.types.is_large_string(arr.type)):
+        is_str = s.map(lambda v: isinstance(v, str)).astype(bool)
+        arr = pa.array(s.where(is_str), type=pa.large_string(),
+                       from_pandas=True)
+    if isinstance(arr, pa.ChunkedArray):
+        arr = arr.combine_chunks()
+    return arr.cast(pa.large_string())
+
+
+# 숫자로 읽을 수 없는 문자열은 null로 바꾼 뒤 float로 변환한다.
+def _to_float(strings):
+    strings = pc.utf8_trim_whitespace(strings)
+    numeric = pc.if_else(pc.match_substring_regex(strings, _FLOAT_PATTERN),
+                         strings, None)
+    return numeric.cast(pa.float64()).to_numpy(zero_copy_only=False)
+
+
+def parse_dms(values):
+    strings = pc.utf8_trim_whitespace(_as_arrow_strings(values))
+    parts = pc.extract_regex(strings, _DMS_PATTERN)
+    degrees, minutes, seconds = (_to_float(pc.struct_field(parts, name))
+                                 for name in ('deg', 'min', 'sec'))
+    dd = degrees + minutes / 60.0 + seconds / 3600.0
+    direction = pc.struct_field(parts, 'dir')
+    negative = pc.fill_null(pc.is_in(direction, pa.array(['S', 'W'])),
+                            False).to_numpy(zero_copy_only=False)
+    dd = np.where(negative, -dd, dd)
+    return dd, ~np.isnan(dd)
+
+
+# '37.846515, 127.345851' 형식. 쉼표가 정확히 하나여야 한다.
+def parse_latlon(values):
+    parts = pc.split_pattern(_as_arrow_strings(values), ',')
+    two = pc.equal(pc.list_value_length(parts), 2)
+    parts = pc.if_else(two, parts, None)
+    lat, lon = (_to_float(pc.list_element(parts, i)) for i in (0, 1))
+    return lat, lon, np.isfinite(lat) & np.isfinite(lon)
@@ -0,0 +1,58 @@
+# --- 집계 큐브 ---
+# 국소 데이터를 (복구상태, 점검내역, 읍면동, ...) 조합별 개수로 한 번의 groupby로 집계해 두고,
+# 화면의 지표(총 국소, 복구, 미복구, 복구율 등)는 모두 이 표에서 찾아 더한다.
+# 조합 수는 국소 수보다 훨씬 적으므로 조회와 새 분류표(breakdown)는 원본을 다시 훑지 않는다.
+# 값은 문자열로 맞춰 비교하고, 결측값은 None 칸으로 모인다.
+import pandas as pd
+
+
+class CountCube:
+
+    def __init__(self, df, dims):
+        self.dims = [dim for dim in dims if dim in df.columns]
+        self.total = len(df)
+        if not self.dims:
+            self.counts = pd.Series([self.total], dtype='int64')
+            return
+        keys = pd.DataFrame({
+            dim: df[dim].astype(object).map(str).where(df[dim].notna(), None)
+            for dim in self.dims
+        })
+        self.counts = keys.groupby(self.dims, dropna=False).size()
+
+    def __contains__(self, dim):
+        return dim in self.dims
+
+    def _mask(self, where):
+        mask = pd.Series(True, index=self.counts.index)
+        for dim, values in (where or {}).items():
+            if dim not in self.dims: return None
+            if isinstance(values, str) or not hasattr(values, '__iter__'):
+                values = [values]
+            level = self.counts.index.get_level_values(dim)
+            mask &= level.isin([str(v) for v in values])
+        return mask
+
+    # where: {차원: 값 또는 값 목록}. 큐브에 없는 차원으로 거르면 0.
+    def count(self, where=None):
+        if not where: return self.total
+        mask = self._mask(where)
+        return 0 if mask is None else int(self.counts[mask].sum())
+
+    # 지정한 차원별 개수 표 (where 조건을 건 뒤 나머지 차원은 합친다)
+    def breakdown(self, dims, where=None):
+        dims = [dims] if isinstance(dims, str) else list(dims)
+        mask = self._mask(where)
+        if mask is None or any(dim not in self.dims for dim in dims):
+            return pd.Series(dtype='int64')
+        return self.counts[mask].groupby(level=dims, dropna=False).sum()
+
+    # 복구/미복구 개수와 복구율(%)
+    def recovery_summary(self, status_dim, where=None):
+        total = self.count(where)
+        if status_dim not in self.dims:
+            return total, 0, 0, 0.0
+        recovered = self.count({**(where or {}), status_dim: '복구'})
+        unrecovered = self.count({**(where or {}), status_dim: '미복구'})
+        rate = recovered / total * 100 if total > 0 else 0.0
+        return total, recovered, unrecovered, rate
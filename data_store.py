@@ -0,0 +1,58 @@
+# --- 세션 공용 읽기 전용 데이터 ---
+# st.cache_data는 호출할 때마다 반환값을 역직렬화해 세션마다 사본을 만든다.
+# 로더 결과와 파생 결과(좌표 배열, 인덱스, 미리 만든 레이어)는 st.cache_resource로
+# 프로세스에 한 벌만 두고, 안의 numpy 배열은 읽기 전용으로 바꿔 공유한다.
+# 세션은 데이터 버전이 붙은 핸들(DataHandle)에서 view()로 복사 없는 얕은 뷰를 받는다.
+# pandas Copy-on-Write(pandas 3부터 항상 켜짐) 덕분에 세션이 뷰를 고치면 그 세션의 뷰만 복사되고
+# 공유 데이터는 그대로다. requirements.txt에서 pandas>=3을 요구하는 이유다.
+import numpy as np
+
+_SKIP_MODULES = ('pandas', 'pyarrow', 'numpy', 'streamlit', 'folium')
+
+
+# value 안의 numpy 배열을 모두 읽기 전용으로 바꾼다. (dict/list/tuple과 객체 속성까지)
+# DataFrame과 Series는 Copy-on-Write 뷰로 보호되므로 건드리지 않는다.
+def freeze(value, _seen=None):
+    _seen = set() if _seen is None else _seen
+    if id(value) in _seen: return value
+    _seen.add(id(value))
+    if isinstance(value, np.ndarray):
+        value.setflags(write=False)
+        if value.dtype == object:
+            for item in value.flat:
+                if isinstance(item, np.ndarray):
+                    freeze(item, _seen)
+    elif isinstance(value, dict):
+        for item in value.values():
+            freeze(item, _seen)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            freeze(item, _seen)
+    elif hasattr(value, '__dict__') and not type(value).__module__.startswith(
+            _SKIP_MODULES):
+        for item in vars(value).values():
+            freeze(item, _seen)
+    return value
+
+
+# 로더 결과(df 또는 (df, RaggedCoords))를 감싼 읽기 전용 핸들
+class DataHandle:
+
+    def __init__(self, result):
+        self._result = freeze(result)
+        self.frame = result[0] if isinstance(result, tuple) else result
+        self.version = self.frame.attrs.get('data_version')
+
+    # 세션용 뷰: df는 데이터를 공유하는 얕은 사본, 나머지(좌표 배열)는 읽기 전용 원본
+    def view(self):
+        if isinstance(self._result, tuple):
+            return (self.frame.copy(deep=False), ) + self._result[1:]
+        return self.frame.copy(deep=False)
+
+
+def share(result):
+    return None if result is None else DataHandle(result)
+
+
+def view(handle):
+    return None if handle is None else handle.view()
@@ -0,0 +1,20 @@
+# --- 입력 파일 버전 감시 ---
+# 각 로더는 자기가 읽는 파일의 버전(수정 시각, 크기)을 캐시 키로 함께 받는다.
+# 파일이 바뀌면 그 파일을 읽는 로더만 다시 실행되고 나머지 로더의 캐시는 그대로 남는다.
+# 화면은 몇 초마다 버전을 다시 확인해(수정 시각 폴링) 바뀐 파일이 있을 때만 다시 그린다.
+import os
+
+
+def file_version(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def changed_files(versions):
+    return [
+        path for path, version in versions.items()
+        if file_version(path) != version
+    ]
@@ -0,0 +1,484 @@
+# --- 지도/데이터 일괄 내보내기 (헤드리스) ---
+# 대시보드를 열 수 없는 현장 작업조에 보낼 정적 지도와 데이터를 Streamlit 없이 만든다.
+# 읍면동 x 클러스터 x 복구 상태 조합('전체' 포함)마다
+#   <이름>.html     지도 (케이블, 국소, 진행 현황, 클러스터 영역; 데이터는 파일 안에 담긴다)
+#   <이름>.geojson  같은 범위의 케이블/국소/진행 현황 피처
+#   <이름>.csv      같은 범위의 국소 목록 (엑셀에서 바로 열리도록 UTF-8 BOM)
+# 을 만든다. 데이터 로딩과 레이어 구성은 대시보드와 같은 loaders/layers 모듈을 쓰고,
+# 입력 엑셀의 스냅샷(.cache/snapshots)도 대시보드와 함께 쓴다.
+# 조합마다 그리는 데이터의 지문을 manifest.json에 남겨, 지문이 그대로인 결과는 다시 만들지 않는다.
+# 그리기는 프로세스 풀로 나눠 돌린다.
+#
+#   python export.py 내보내기 --data-dir . --workers 4
+import argparse
+import functools
+import hashlib
+import json
+import math
+import multiprocessing
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import folium
+import numpy as np
+import pandas as pd
+from branca.element import Element
+
+from clusters import ClusterIndex
+from geocache import GeocodeCache
+from geocoding import GeocodingPipeline, make_backend
+from layers import (CABLE_STYLE, EMD_COLUMN, RECOVERY_POPUP_FIELDS,
+                    PrebuiltGeoJson, add_cluster_areas, build_base_map,
+                    build_cable_pyramid, build_popup_table, feature_collection,
+                    lod_tier_for_zoom, overlay_groups, progress_marker_data,
+                    progress_marker_layer, progress_popup_fields,
+                    recovery_marker_data, recovery_marker_layer)
+from loaders import (CABLE_FILE, CLUSTER_FILE, PROGRESS_FILE, RECOVERY_FILE,
+                     attach_geocoded_coords, load_cable, load_cluster_geojson,
+                     load_progress, load_progress_map, load_recovery,
+                     read_progress_workbook, recovery_emds, station_latlon)
+from proximity import CableProximity
+
+ALL = '전체'
+MANIFEST_FILE = "manifest.json"
+# 출력 형식이나 그리기 방식이 바뀌면 올려서 예전 결과를 모두 다시 만든다.
+EXPORT_VERSION = '2'
+DEFAULT_PROXIMITY_M = 200
+# 지도에 맞춘 줌보다 이만큼 더 확대해도 케이블이 거칠어 보이지 않는 단순화 단계를 쓴다.
+ZOOM_HEADROOM = 2
+MAP_WIDTH_PX = 1200
+CSV_COLUMNS = [
+    '국소명', '시설코드', '주소', '지역', '읍면동', '클러스터', '복구상태',
+    'RU / 중계기=>중계기 종류', '공동망구분', '점검내역(정전/선로불량/유니트)', '위도', '경도',
+    '위치정보 소스', '케이블 거리(m)'
+]
+
+
+# 내보내기에 쓰는 데이터 한 벌. 부모 프로세스에서 한 번 만들고, 작업 프로세스는
+# (fork로) 물려받거나 스냅샷에서 다시 읽는다.
+class ExportData:
+
+    def __init__(self, proximity_m=DEFAULT_PROXIMITY_M, geocode=False):
+        self.proximity_m = proximity_m
+        self.df_cable, self.cable_coords = (load_cable(CABLE_FILE) if
+                                            os.path.exists(CABLE_FILE) else
+                                            None) or (None, None)
+        self.geojson, self.cluster_version = load_cluster_geojson(CLUSTER_FILE)
+        self.clusters = ClusterIndex(self.geojson)
+
+        self.df_recovery = None
+        if os.path.exists(RECOVERY_FILE):
+            df = load_recovery(RECOVERY_FILE)
+            if df is not None:
+                self.df_recovery = self._with_stations(df, geocode)
+
+        self.df_progress = None
+        if os.path.exists(PROGRESS_FILE):
+            read_workbook = functools.cache(
+                lambda: read_progress_workbook(PROGRESS_FILE))
+            df = load_progress_map(PROGRESS_FILE,
+                                   load_progress(PROGRESS_FILE, read_workbook))
+            if df is not None:
+                self.df_progress = df.assign(
+                    **{
+                        '클러스터':
+                        self.clusters.labels(df['latitude_dd'],
+                                             df['longitude_dd'])
+                    })
+
+        self.cable_pyramid, self.cable_clusters = None, None
+        if self.df_cable is not None:
+            self.cable_pyramid = build_cable_pyramid(self.df_cable,
+                                                     self.cable_coords)
+            # 케이블별로 점이 하나라도 들어가는 클러스터 (케이블 수, 클러스터 수)
+            vertex_cluster = self.clusters.assign(self.cable_coords.coords[:, 0],
+                                                  self.cable_coords.coords[:, 1])
+            inside = vertex_cluster >= 0
+            self.cable_clusters = np.zeros(
+                (len(self.cable_coords), len(self.clusters)), dtype=bool)
+            self.cable_clusters[self.cable_coords.part_ids()[inside],
+                                vertex_cluster[inside]] = True
+
+    # 지오코딩 좌표, 읍면동, 클러스터, 가장 가까운 케이블 거리를 붙인다.
+    # geocode가 False면 캐시에 있는 지오코딩 결과만 쓴다.
+    def _with_stations(self, df, geocode):
+        keys = list(df['geocode_key'].dropna().unique())
+        cache = GeocodeCache()
+        try:
+            if geocode and keys:
+                results = dict(
+                    GeocodingPipeline(make_backend(), cache).stream(keys))
+            else:
+                results = cache.get_many(keys)
+        finally:
+            cache.close()
+        df = attach_geocoded_coords(df, results)
+        lat, lon = station_latlon(df)
+        distance = np.full(len(df), np.nan)
+        if self.df_cable is not None:
+            _, distance = CableProximity(self.cable_coords).nearest(lat, lon)
+        return df.assign(
+            **{
+                '읍면동': recovery_emds(df),
+                '클러스터': self.clusters.labels(lat, lon),
+                '케이블 거리(m)': np.round(distance, 1),
+            })
+
+    # 대시보드의 '읍면동 선택'과 같이 광케이블 시트의 읍면동을 쓴다. (없으면 국소의 '지역'에서)
+    def emds(self):
+        if self.df_cable is not None and EMD_COLUMN in self.df_cable.columns:
+            return sorted(map(str, self.df_cable[EMD_COLUMN].dropna().unique()))
+        if self.df_recovery is not None:
+            return sorted(map(str, self.df_recovery['읍면동'].dropna().unique()))
+        return []
+
+    def statuses(self):
+        if self.df_recovery is None or '복구상태' not in self.df_recovery.columns:
+            return []
+        return sorted(map(str, self.df_recovery['복구상태'].dropna().unique()))
+
+    # 조합 하나의 (국소 위치, 진행 현황 위치, 케이블 번호) 배열
+    def select(self, emd, cluster, status):
+        stations = progress = cables = np.empty(0, dtype=np.int64)
+        if self.df_recovery is not None:
+            df = self.df_recovery
+            mask = np.ones(len(df), dtype=bool)
+            if emd != ALL: mask &= (df['읍면동'] == emd).to_numpy(dtype=bool)
+            if cluster != ALL:
+                mask &= (df['클러스터'] == cluster).to_numpy(dtype=bool)
+            if status != ALL and '복구상태' in df.columns:
+                mask &= (df['복구상태'] == status).to_numpy(dtype=bool)
+            stations = np.flatnonzero(mask)
+        if self.df_progress is not None:
+            df = self.df_progress
+            mask = np.ones(len(df), dtype=bool)
+            # 진행 현황에는 읍면동 컬럼이 없으므로 주소에 읍면동 이름이 있는지로 고른다.
+            if emd != ALL:
+                mask &= (df['주소'].astype(object).str.contains(
+                    emd, regex=False).fillna(False).to_numpy(dtype=bool)
+                         if '주소' in df.columns else False)
+            if cluster != ALL:
+                mask &= (df['클러스터'] == cluster).to_numpy(dtype=bool)
+            progress = np.flatnonzero(mask)
+        if self.df_cable is not None:
+            mask = np.ones(len(self.df_cable), dtype=bool)
+            if emd != ALL:
+                mask &= (self.df_cable[EMD_COLUMN] == emd).to_numpy(
+                    dtype=bool) if EMD_COLUMN in self.df_cable.columns else False
+            if cluster != ALL:
+                mask &= self.cable_clusters[:,
+                                            self.clusters.names.index(cluster)]
+            cables = np.flatnonzero(mask)
+        return stations, progress, cables
+
+    # 그릴 내용의 지문. 이 값이 같으면 결과 파일도 같다.
+    def fingerprint(self, job):
+        digest = hashlib.sha256()
+        digest.update(
+            json.dumps([
+                EXPORT_VERSION, job['emd'], job['cluster'], job['status'],
+                self.proximity_m, self.cluster_version,
+                self.df_cable.attrs.get('data_version')
+                if self.df_cable is not None else None
+            ],
+                       ensure_ascii=False).encode('utf-8'))
+        digest.update(job['cables'].tobytes())
+        for df, rows in ((self.df_recovery, job['stations']),
+                         (self.df_progress, job['progress'])):
+            if df is not None and len(rows):
+                digest.update(
+                    pd.util.hash_pandas_object(df.iloc[rows].astype(str),
+                                               index=True).to_numpy().tobytes())
+        return digest.hexdigest()[:16]
+
+
+def output_name(emd, cluster, status):
+    return re.sub(r'[\\/:*?"<>|\s]+', '_', f"{emd}__{cluster}__{status}")
+
+
+def plan_jobs(data):
+    jobs = []
+    for emd in [ALL] + data.emds():
+        for cluster in [ALL] + data.clusters.names:
+            for status in [ALL] + data.statuses():
+                stations, progress, cables = data.select(emd, cluster, status)
+                if not (len(stations) or len(progress) or len(cables)):
+                    continue
+                job = {
+                    'name': output_name(emd, cluster, status),
+                    'emd': emd,
+                    'cluster': cluster,
+                    'status': status,
+                    'stations': stations,
+                    'progress': progress,
+                    'cables': cables,
+                }
+                job['fingerprint'] = data.fingerprint(job)
+                jobs.append(job)
+    return jobs
+
+
+# --- 작업 프로세스 ---
+_data = None
+
+
+def _init_worker(data_dir, proximity_m):
+    global _data
+    if _data is None:
+        os.chdir(data_dir)
+        _data = ExportData(proximity_m)
+
+
+def _bounds(data, job):
+    lat, lon = [], []
+    if len(job['stations']):
+        station_lat, station_lon = station_latlon(
+            data.df_recovery.iloc[job['stations']])
+        lat.append(station_lat)
+        lon.append(station_lon)
+    if len(job['progress']):
+        df = data.df_progress.iloc[job['progress']]
+        lat.append(df['latitude_dd'].to_numpy(dtype=float))
+        lon.append(df['longitude_dd'].to_numpy(dtype=float))
+    if len(job['cables']):
+        bounds = data.cable_coords.bounds()[job['cables']]
+        lat += [bounds[:, 0], bounds[:, 2]]
+        lon += [bounds[:, 1], bounds[:, 3]]
+    lat, lon = np.concatenate(lat), np.concatenate(lon)
+    return (np.nanmin(lat), np.nanmin(lon), np.nanmax(lat), np.nanmax(lon))
+
+
+# 범위를 MAP_WIDTH_PX 폭 지도에 맞췄을 때의 줌 (웹 메르카토르, 타일 256px)
+def _fitted_zoom(bounds):
+    span = max(bounds[3] - bounds[1], (bounds[2] - bounds[0]) /
+               max(math.cos(math.radians(bounds[0])), 1e-6), 1e-6)
+    return max(0, math.floor(math.log2(360.0 * MAP_WIDTH_PX / (256 * span))))
+
+
+def _render_map(data, job, path):
+    stations = (data.df_recovery.iloc[job['stations']]
+                if len(job['stations']) else None)
+    progress = (data.df_progress.iloc[job['progress']]
+                if len(job['progress']) else None)
+    popup_tables = {}
+    if stations is not None:
+        popup_tables['recovery'] = build_popup_table(stations,
+                                                     RECOVERY_POPUP_FIELDS)
+    if progress is not None:
+        popup_tables['progress'] = build_popup_table(
+            progress, progress_popup_fields(progress))
+
+    bounds = _bounds(data, job)
+    m = build_base_map(popup_tables,
+                       location=[(bounds[0] + bounds[2]) / 2,
+                                 (bounds[1] + bounds[3]) / 2])
+    title = f"{job['emd']} / {job['cluster']} / {job['status']}"
+    m.get_root().header.add_child(Element(f"<title>{title}</title>"))
+    m.fit_bounds([[bounds[0], bounds[1]], [bounds[2], bounds[3]]])
+    overlays = overlay_groups()
+
+    geojson = data.geojson
+    if job['cluster'] != ALL:
+        i = data.clusters.names.index(job['cluster'])
+        geojson = {
+            'type': 'FeatureCollection',
+            'features': [data.clusters.features[i]]
+        }
+    add_cluster_areas(geojson, overlays['클러스터 영역'])
+    if len(job['cables']):
+        tier = lod_tier_for_zoom(_fitted_zoom(bounds) + ZOOM_HEADROOM)
+        PrebuiltGeoJson(feature_collection(
+            data.cable_pyramid[tier]['features'][job['cables']]),
+                        style=CABLE_STYLE,
+                        control=False).add_to(overlays['광케이블'])
+    if stations is not None:
+        recovery_marker_layer(
+            recovery_marker_data(
+                stations, (stations['케이블 거리(m)'] <=
+                           data.proximity_m).to_numpy())).add_to(
+                               overlays['국소'])
+    if progress is not None:
+        progress_marker_layer(progress_marker_data(progress)).add_to(
+            overlays['진행 현황'])
+    for group in overlays.values():
+        group.add_to(m)
+    folium.LayerControl().add_to(m)
+    m.save(path)
+
+
+def _json_value(value):
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    if isinstance(value, (np.integer, np.floating, np.bool_)):
+        return value.item()
+    return value if isinstance(value, (int, float, bool, str)) else str(value)
+
+
+def _point_features(df, lat, lon, kind, columns):
+    records = df[columns].astype(object).to_dict('records')
+    return [{
+        'type': 'Feature',
+        'properties': {
+            '종류': kind,
+            **{k: _json_value(v)
+               for k, v in record.items()}
+        },
+        'geometry': {
+            'type': 'Point',
+            'coordinates': [round(float(x), 7),
+                            round(float(y), 7)]
+        }
+    } for record, y, x in zip(records, lat, lon)]
+
+
+# GeoJSON과 CSV에 함께 쓰는 국소 표. 위도/경도는 지도에 찍는 좌표(십진수)로 바꿔 넣는다.
+def _station_table(df):
+    lat, lon = station_latlon(df)
+    df = df.assign(위도=lat,
+                   경도=lon,
+                   **{
+                       '위치정보 소스':
+                       np.where(df['geocoded_lat'].notna(), "주소기반",
+                                "엑셀좌표(DMS)")
+                   })
+    return df[[c for c in CSV_COLUMNS if c in df.columns]]
+
+
+def _write_geojson(data, job, path):
+    features = []
+    for i in job['cables']:
+        name = (data.df_cable[EMD_COLUMN].iloc[i]
+                if EMD_COLUMN in data.df_cable.columns else None)
+        features.append({
+            'type': 'Feature',
+            'properties': {
+                '종류': '광케이블',
+                EMD_COLUMN: _json_value(name)
+            },
+            'geometry': {
+                'type': 'LineString',
+                'coordinates': data.cable_coords[i][:, ::-1].tolist()
+            }
+        })
+    if len(job['stations']):
+        df = _station_table(data.df_recovery.iloc[job['stations']])
+        features += _point_features(df, df['위도'], df['경도'], '국소',
+                                    list(df.columns))
+    if len(job['progress']):
+        df = data.df_progress.iloc[job['progress']]
+        features += _point_features(
+            df, df['latitude_dd'], df['longitude_dd'], '진행 현황', [
+                c for c in df.columns
+                if c not in ['latitude_dd', 'longitude_dd', '위경도']
+            ])
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'type': 'FeatureCollection',
+            'features': features
+        },
+                  f,
+                  ensure_ascii=False,
+                  separators=(',', ':'))
+
+
+def _write_csv(data, job, path):
+    if data.df_recovery is None:
+        df = pd.DataFrame(columns=CSV_COLUMNS)
+    else:
+        df = _station_table(data.df_recovery.iloc[job['stations']])
+    df.to_csv(path, index=False, encoding='utf-8-sig')
+
+
+# 결과는 임시 파일에 쓴 뒤 바꿔 넣어, 중간에 멈춰도 반쯤 쓴 파일이 남지 않게 한다.
+def render_job(job, out_dir):
+    started = time.perf_counter()
+    for suffix, write in (('.html', _render_map), ('.geojson', _write_geojson),
+                          ('.csv', _write_csv)):
+        path = os.path.join(out_dir, job['name'] + suffix)
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        write(_data, job, tmp_path)
+        os.replace(tmp_path, path)
+    return job['name'], time.perf_counter() - started
+
+
+# --- 실행 ---
+def _read_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, MANIFEST_FILE), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_manifest(out_dir, manifest):
+    path = os.path.join(out_dir, MANIFEST_FILE)
+    with open(path + ".tmp", 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+
+def _is_current(out_dir, manifest, job):
+    return manifest.get(job['name']) == job['fingerprint'] and all(
+        os.path.exists(os.path.join(out_dir, job['name'] + suffix))
+        for suffix in ('.html', '.geojson', '.csv'))
+
+
+def export(out_dir, data_dir=".", workers=None, force=False,
+           proximity_m=DEFAULT_PROXIMITY_M, geocode=False):
+    global _data
+    out_dir = os.path.abspath(out_dir)
+    data_dir = os.path.abspath(data_dir)
+    os.makedirs(out_dir, exist_ok=True)
+    os.chdir(data_dir)
+    _data = ExportData(proximity_m, geocode)
+    jobs = plan_jobs(_data)
+    manifest = _read_manifest(out_dir)
+    todo = [j for j in jobs if force or not _is_current(out_dir, manifest, j)]
+    print(f"조합 {len(jobs)}개 중 {len(todo)}개를 만듭니다 "
+          f"(변경 없음 {len(jobs) - len(todo)}개 건너뜀)",
+          file=sys.stderr)
+    if not todo: return manifest
+
+    # fork가 되면 작업 프로세스가 이미 읽은 데이터를 그대로 물려받는다.
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+    fingerprints = {job['name']: job['fingerprint'] for job in todo}
+    try:
+        with ProcessPoolExecutor(max_workers=workers,
+                                 mp_context=context,
+                                 initializer=_init_worker,
+                                 initargs=(data_dir, proximity_m)) as pool:
+            futures = [pool.submit(render_job, job, out_dir) for job in todo]
+            for future in as_completed(futures):
+                name, seconds = future.result()
+                manifest[name] = fingerprints[name]
+                print(f"  {name} ({seconds:.1f}s)", file=sys.stderr)
+    finally:
+        _write_manifest(out_dir, manifest)
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="읍면동/클러스터/복구 상태별 지도(HTML)와 GeoJSON/CSV 일괄 내보내기")
+    parser.add_argument('out_dir')
+    parser.add_argument('--data-dir', default=".",
+                        help="입력 엑셀 파일이 있는 디렉터리 (대시보드 실행 위치)")
+    parser.add_argument('--workers', type=int, help="작업 프로세스 수 (기본: CPU 수)")
+    parser.add_argument('--force', action='store_true',
+                        help="바뀌지 않은 결과도 다시 만든다")
+    parser.add_argument('--proximity-m', type=float,
+                        default=DEFAULT_PROXIMITY_M,
+                        help="광케이블 근접 표시 기준 거리(m)")
+    parser.add_argument('--geocode', action='store_true',
+                        help="캐시에 없는 주소도 지오코딩한다 (기본: 캐시에 있는 좌표만 사용)")
+    args = parser.parse_args(argv)
+    export(args.out_dir, args.data_dir, args.workers, args.force,
+           args.proximity_m, args.geocode)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# --- 범주형 필터 인덱스 ---
+# 필터에 쓰는 컬럼을 데이터 버전마다 한 번 범주 코드로 바꾸고, 값마다 해당 행 비트맵
+# (np.packbits로 8행을 1바이트에 담은 배열)을 만들어 둔다.
+# 필터 조합은 컬럼 안에서는 선택 값 비트맵의 OR, 컬럼 사이에서는 AND로 계산하며,
+# 같은 필터 조합의 결과(bool 마스크)는 저장해 두고 다시 계산하지 않는다.
+# 값은 문자열로 비교한다(결측값은 'nan'이 되며 선택지 목록에서는 빠진다).
+import threading
+
+import numpy as np
+import pandas as pd
+
+MAX_CACHED_MASKS = 64
+
+
+class FilterIndex:
+
+    def __init__(self, df, columns):
+        self.size = len(df)
+        self._nbytes = (self.size + 7) // 8
+        self._bitmaps = {}
+        self._options = {}
+        self._masks = {}
+        # 여러 세션 스레드가 같은 인덱스를 함께 쓰므로 마스크 저장소는 잠금 아래에서만 다룬다.
+        self._masks_lock = threading.Lock()
+        for column in columns:
+            if column not in df.columns: continue
+            values = df[column].astype(object)
+            codes, categories = pd.factorize(values.map(str))
+            self._bitmaps[column] = {
+                category: np.packbits(codes == code)
+                for code, category in enumerate(categories)
+            }
+            # 선택지는 처음 나온 순서대로, 결측값은 제외
+            present = pd.unique(values[values.notna()].map(str))
+            self._options[column] = list(present)
+
+    def __contains__(self, column):
+        return column in self._bitmaps
+
+    def options(self, column, sort=False):
+        options = self._options.get(column, [])
+        return sorted(options) if sort else list(options)
+
+    # selections: ((컬럼, 선택 값 목록 또는 None), ...). None이거나 인덱스에 없는 컬럼은
+    # 조건에서 빠진다. 반환하는 마스크는 공유되므로 읽기 전용이다.
+    def mask(self, selections):
+        key = tuple((column, None if values is None else tuple(values))
+                    for column, values in selections)
+        with self._masks_lock:
+            mask = self._masks.get(key)
+        if mask is not None: return mask
+
+        bits = np.full(self._nbytes, 0xFF, dtype=np.uint8)
+        for column, values in key:
+            if values is None or column not in self._bitmaps: continue
+            bitmaps = self._bitmaps[column]
+            selected = np.zeros(self._nbytes, dtype=np.uint8)
+            for value in values:
+                if value in bitmaps:
+                    selected |= bitmaps[value]
+            bits &= selected
+        mask = np.unpackbits(bits, count=self.size).astype(bool)
+        mask.setflags(write=False)
+
+        with self._masks_lock:
+            if len(self._masks) >= MAX_CACHED_MASKS:
+                self._masks.clear()
+            self._masks[key] = mask
+        return mask
@@ -0,0 +1,119 @@
+# --- 지오코딩 결과 디스크 캐시 (SQLite) ---
+# 주소 -> 좌표 결과를 정규화된 주소 키로 저장해, 새로고침(캐시 초기화) 후에도
+# 새로 추가되었거나 만료된 주소만 지오코더로 보낸다.
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+
+DEFAULT_CACHE_PATH = os.path.join(".cache", "geocode.sqlite3")
+DEFAULT_TTL_SECONDS = 30 * 24 * 3600  # 성공 결과: 30일
+DEFAULT_NEGATIVE_TTL_SECONDS = 24 * 3600  # 찾을 수 없는 주소: 1일
+
+
+def normalize_address(address):
+    if not isinstance(address, str): return None
+    text = unicodedata.normalize('NFC', address)
+    text = re.sub(r'\s+', ' ', text).strip()
+    return text or None
+
+
+class GeocodeCache:
+
+    def __init__(self,
+                 path=DEFAULT_CACHE_PATH,
+                 ttl_seconds=DEFAULT_TTL_SECONDS,
+                 negative_ttl_seconds=DEFAULT_NEGATIVE_TTL_SECONDS):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self._lock = threading.Lock()
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS geocode (
+                    address TEXT PRIMARY KEY,
+                    lat REAL,
+                    lon REAL,
+                    updated_at REAL NOT NULL
+                )""")
+
+    # 만료되지 않은 결과만 반환: {주소: (lat, lon)} 또는 {주소: None}(음성 캐시)
+    def get_many(self, addresses, now=None):
+        now = time.time() if now is None else now
+        keys = list(addresses)
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT address, lat, lon, updated_at FROM geocode "
+                    f"WHERE address IN ({placeholders})", chunk).fetchall()
+                for address, lat, lon, updated_at in rows:
+                    if lat is None or lon is None:
+                        if now - updated_at < self.negative_ttl_seconds:
+                            found[address] = None
+                    elif now - updated_at < self.ttl_seconds:
+                        found[address] = (lat, lon)
+        return found
+
+    def put_many(self, results, now=None):
+        now = time.time() if now is None else now
+        rows = [(address, coords[0] if coords else None,
+                 coords[1] if coords else None, now)
+                for address, coords in results.items()]
+        if not rows: return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO geocode (address, lat, lon, updated_at) "
+                "VALUES (?, ?, ?, ?)", rows)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# 좌표 -> 주소(역지오코딩) 결과를 격자 칸 키로 저장한다. 지오코딩 캐시와 같은 파일을 쓴다.
+class ReverseGeocodeCache:
+
+    def __init__(self, path=DEFAULT_CACHE_PATH,
+                 ttl_seconds=DEFAULT_TTL_SECONDS):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS reverse_geocode (
+                    cell TEXT PRIMARY KEY,
+                    address TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )""")
+
+    def get(self, cell, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT address, updated_at FROM reverse_geocode WHERE cell = ?",
+                (cell, )).fetchone()
+        if row and now - row[1] < self.ttl_seconds:
+            return row[0]
+        return None
+
+    def put(self, cell, address, now=None):
+        now = time.time() if now is None else now
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO reverse_geocode (cell, address, updated_at) "
+                "VALUES (?, ?, ?)", (cell, address, now))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,253 @@
+# --- 동시 지오코딩 파이프라인 ---
+# 백엔드(Nominatim, 자체 구축 Nominatim, 오프라인 지명사전 파일, 테스트용 가짜 백엔드)를
+# 바꿔 끼울 수 있고, 백엔드별 초당 요청 한도를 지키면서 스레드 풀로 조회한다.
+# 결과는 끝나는 순서대로 흘려보내 화면이 전부 끝날 때까지 기다리지 않아도 된다.
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import pandas as pd
+
+from geocache import normalize_address
+
+
+# 초당 요청 수 한도. 여러 작업 스레드가 같이 써도 요청 간격이 1/rate 이상 유지된다.
+class RateBudget:
+
+    def __init__(self, rate_per_second):
+        self.interval = 1.0 / rate_per_second if rate_per_second else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def acquire(self):
+        if not self.interval: return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+# --- 백엔드 ---
+# geocode(address)는 (lat, lon) 또는 None(찾을 수 없음)을 반환하고,
+# 네트워크 오류 등 일시적인 실패는 예외로 알린다.
+# 역지오코딩을 지원하는 백엔드는 reverse(lat, lon) -> 주소 또는 None도 제공한다.
+class NominatimBackend:
+
+    def __init__(self,
+                 user_agent="gapyeong_dashboard_app_v3",
+                 domain=None,
+                 scheme=None,
+                 rate_per_second=1.0,
+                 max_workers=2,
+                 timeout=10):
+        from geopy.geocoders import Nominatim
+        options = {'user_agent': user_agent, 'timeout': timeout}
+        if domain: options['domain'] = domain
+        if scheme: options['scheme'] = scheme
+        self._geolocator = Nominatim(**options)
+        self.name = f"nominatim:{domain or 'public'}"
+        self.rate_per_second = rate_per_second
+        self.max_workers = max_workers
+
+    def geocode(self, address):
+        location = self._geolocator.geocode(address)
+        if location:
+            return (location.latitude, location.longitude)
+        return None
+
+    def reverse(self, lat, lon):
+        location = self._geolocator.reverse((lat, lon), language="ko")
+        return location.address if location else None
+
+
+# 주소,위도,경도 컬럼을 가진 CSV 파일을 조회표로 쓰는 오프라인 백엔드
+class GazetteerBackend:
+
+    def __init__(self, path, address_col='address', lat_col='lat',
+                 lon_col='lon'):
+        df = pd.read_csv(path)
+        keys = df[address_col].map(normalize_address)
+        self._table = {
+            key: (float(lat), float(lon))
+            for key, lat, lon in zip(keys, df[lat_col], df[lon_col])
+            if key and pd.notna(lat) and pd.notna(lon)
+        }
+        self.name = f"gazetteer:{os.path.basename(path)}"
+        self.rate_per_second = None
+        self.max_workers = 1
+
+    def geocode(self, address):
+        return self._table.get(address)
+
+
+# 네트워크 없이 처리량을 재기 위한 가짜 백엔드.
+# 주소 해시로 가평군 범위 안의 좌표를 만들어 같은 주소에는 항상 같은 좌표를 준다.
+class FakeBackend:
+
+    BOUNDS = ((37.70, 127.25), (37.95, 127.60))
+
+    def __init__(self, latency=0.05, miss_rate=0.0, error_rate=0.0,
+                 rate_per_second=None, max_workers=8):
+        self.latency = latency
+        self.miss_rate = miss_rate
+        self.error_rate = error_rate
+        self.rate_per_second = rate_per_second
+        self.max_workers = max_workers
+        self.name = "fake"
+        # 조회 횟수. 파이프라인의 여러 작업 스레드에서 함께 올리므로 잠금 아래에서 센다.
+        self.calls = 0
+        self._calls_lock = threading.Lock()
+
+    def _count_call(self):
+        with self._calls_lock:
+            self.calls += 1
+
+    def geocode(self, address):
+        self._count_call()
+        if self.latency: time.sleep(self.latency)
+        digest = hashlib.sha1(address.encode('utf-8')).digest()
+        u1, u2, u3 = (int.from_bytes(digest[i:i + 4], 'big') / 2**32
+                      for i in (0, 4, 8))
+        if u3 < self.error_rate:
+            raise ConnectionError(f"fake geocoder failure: {address}")
+        if u3 < self.error_rate + self.miss_rate:
+            return None
+        (lat0, lon0), (lat1, lon1) = self.BOUNDS
+        return (lat0 + (lat1 - lat0) * u1, lon0 + (lon1 - lon0) * u2)
+
+    def reverse(self, lat, lon):
+        self._count_call()
+        if self.latency: time.sleep(self.latency)
+        return f"경기 가평군 (가짜 주소 {lat:.4f}, {lon:.4f})"
+
+
+# GEOCODER_BACKEND 환경 변수로 백엔드를 고른다. (nominatim | gazetteer | fake)
+def make_backend(kind=None):
+    kind = kind or os.environ.get('GEOCODER_BACKEND', 'nominatim')
+    if kind == 'nominatim':
+        domain = os.environ.get('NOMINATIM_DOMAIN')
+        # 자체 구축 서버는 공용 서버의 초당 1건 제한을 따를 필요가 없다.
+        rate = float(os.environ.get('NOMINATIM_RATE', 10 if domain else 1))
+        return NominatimBackend(domain=domain,
+                                scheme=os.environ.get('NOMINATIM_SCHEME'),
+                                rate_per_second=rate,
+                                max_workers=4 if domain else 2)
+    if kind == 'gazetteer':
+        return GazetteerBackend(
+            os.environ.get('GEOCODER_GAZETTEER', 'gazetteer.csv'))
+    if kind == 'fake':
+        return FakeBackend()
+    raise ValueError(f"알 수 없는 지오코더 백엔드: {kind}")
+
+
+# --- 파이프라인 ---
+class GeocodingPipeline:
+
+    def __init__(self, backend, cache=None, max_workers=None):
+        self.backend = backend
+        self.cache = cache
+        self.max_workers = max_workers or getattr(backend, 'max_workers', 4)
+        self.budget = RateBudget(getattr(backend, 'rate_per_second', None))
+
+    def _lookup(self, address):
+        self.budget.acquire()
+        return self.backend.geocode(address)
+
+    # 정규화된 주소 키를 받아 (주소, 좌표) 쌍을 끝나는 순서대로 내보낸다.
+    # 캐시 적중분을 먼저 내보내고, 나머지는 동시에 max_workers * 2개까지만 띄운다.
+    # 예외가 난 주소는 내보내지도 캐시에 남기지도 않고, failed 목록을 주면 거기에 모은다.
+    def stream(self, addresses, failed=None):
+        keys = list(dict.fromkeys(k for k in addresses if k))
+        cached = self.cache.get_many(keys) if self.cache else {}
+        yield from cached.items()
+
+        todo = iter([k for k in keys if k not in cached])
+        with ThreadPoolExecutor(max_workers=self.max_workers,
+                                thread_name_prefix='geocode') as executor:
+            in_flight = {}
+
+            def fill():
+                for key in todo:
+                    in_flight[executor.submit(self._lookup, key)] = key
+                    if len(in_flight) >= self.max_workers * 2: break
+
+            fill()
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    key = in_flight.pop(future)
+                    try:
+                        coords = future.result()
+                    except Exception:
+                        if failed is not None: failed.append(key)
+                        continue
+                    if self.cache: self.cache.put_many({key: coords})
+                    yield key, coords
+                fill()
+
+
+def geocoded_frame(keys, resolved):
+    coords = [resolved.get(k) for k in keys]
+    return pd.DataFrame(
+        {
+            'geocoded_lat': [c[0] if c else float('nan') for c in coords],
+            'geocoded_lon': [c[1] if c else float('nan') for c in coords],
+        },
+        index=keys.index)
+
+
+# 백그라운드 스레드에서 파이프라인을 돌리며 결과를 모아 두는 작업.
+# 대시보드는 매 실행마다 지금까지 모인 결과만 붙여서 그린다.
+# 조회 중 예외가 난 주소는 결과에 넣지 않고 RETRY_DELAYS(초) 간격으로 다시 조회한다.
+# 끝까지 실패한 주소는 failed에 남으므로, 호출하는 쪽에서 새 작업으로 다시 시도할 수 있다.
+RETRY_DELAYS = (5, 30, 120)
+
+
+class GeocodingJob:
+
+    def __init__(self, pipeline, addresses):
+        self.keys = list(dict.fromkeys(k for k in addresses if k))
+        self.total = len(self.keys)
+        # 캐시 적중분은 바로 채워 두어 첫 화면부터 보이게 한다.
+        self.results = pipeline.cache.get_many(
+            self.keys) if pipeline.cache else {}
+        self.pending = [k for k in self.keys if k not in self.results]
+        self.failed = []
+        self.finished_at = None
+        self._thread = threading.Thread(target=self._run,
+                                        name='geocoding-job',
+                                        daemon=True)
+        self._pipeline = pipeline
+        self._thread.start()
+
+    def _run(self):
+        try:
+            pending = self.pending
+            for delay in (0, ) + RETRY_DELAYS:
+                if delay: time.sleep(delay)
+                failed = []
+                for key, coords in self._pipeline.stream(pending, failed):
+                    self.results[key] = coords
+                self.failed = pending = failed
+                if not failed: break
+        except RuntimeError:
+            # 인터프리터가 종료되는 중에는 스레드 풀에 새 조회를 넣을 수 없다.
+            pass
+        finally:
+            self.finished_at = time.monotonic()
+
+    @property
+    def completed(self):
+        return len(self.results)
+
+    @property
+    def finished(self):
+        return self.finished_at is not None
+
+    def wait(self, timeout=None):
+        self._thread.join(timeout)
+        return self.finished
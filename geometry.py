@@ -0,0 +1,269 @@
+# --- 광케이블 좌표 파싱과 가변 길이(ragged) 좌표 배열 ---
+# 각 케이블의 좌표를 행마다 파이썬 리스트로 들고 있는 대신, 전체 점을 하나의 연속된
+# (점 개수, 2) 배열에 [위도, 경도] 순으로 담고 offsets[i]:offsets[i + 1] 구간으로 i번째
+# 케이블을 가리킨다. (GeoArrow의 LineString 배치와 같은 구조)
+import re
+
+import numpy as np
+import pyarrow as pa
+
+# 원래 행 단위 파서(re.findall(r'(\d+\.\d+\s\d+\.\d+)'))와 같은 결과를 내는 좌표쌍 규칙.
+# 일반적인 WKT 행은 아래 바이트 단위 벡터 경로로 처리하고, 규칙이 애매한 행
+# (비 ASCII 문자, 쌍이 맞지 않는 숫자 등)만 이 정규식으로 한 행씩 처리한다.
+_WKT_PAIR = re.compile(r'(\d+\.\d+)\s(\d+\.\d+)')
+_ROW_SEPARATOR = '|'
+_CHUNK_BYTES = 32 << 20
+
+_IS_SPACE = np.zeros(256, dtype=bool)
+_IS_SPACE[list(b' \t\n\r\x0b\x0c')] = True
+
+
+class RaggedCoords:
+
+    def __init__(self, coords, offsets):
+        self.coords = coords
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    # i번째 케이블의 좌표 (복사 없는 뷰)
+    def __getitem__(self, i):
+        return self.coords[self.offsets[i]:self.offsets[i + 1]]
+
+    @property
+    def lengths(self):
+        return np.diff(self.offsets)
+
+    # 각 점이 몇 번째 케이블에 속하는지
+    def part_ids(self):
+        return np.repeat(np.arange(len(self)), self.lengths)
+
+    # 여러 조각(예: 시트를 나눠 읽고 파싱한 결과)을 순서대로 이어 붙인다.
+    @classmethod
+    def concat(cls, parts):
+        parts = list(parts)
+        if not parts:
+            return cls(np.empty((0, 2)), np.zeros(1, dtype=np.int64))
+        lengths = np.concatenate([part.lengths for part in parts])
+        offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        return cls(np.concatenate([part.coords for part in parts]), offsets)
+
+    # 케이블별 경계 상자: (min_lat, min_lon, max_lat, max_lon) 배열
+    def bounds(self):
+        if len(self) == 0:
+            return np.empty((0, 4), dtype=self.coords.dtype)
+        starts = self.offsets[:-1]
+        mins = np.minimum.reduceat(self.coords, starts, axis=0)
+        maxs = np.maximum.reduceat(self.coords, starts, axis=0)
+        return np.hstack([mins, maxs])
+
+    # Arrow list<fixed_size_list<2>> 배열로 변환 (버퍼를 그대로 공유)
+    def to_arrow(self):
+        points = pa.FixedSizeListArray.from_arrays(
+            pa.array(self.coords.reshape(-1)), 2)
+        return pa.ListArray.from_arrays(pa.array(self.offsets, pa.int64()),
+                                        points)
+
+    @classmethod
+    def from_arrow(cls, array):
+        if isinstance(array, pa.ChunkedArray):
+            array = array.combine_chunks()
+        offsets = array.offsets.to_numpy()
+        flat = array.values.values.to_numpy()
+        coords = flat.reshape(-1, 2)
+        if offsets[0] != 0:
+            coords = coords[offsets[0]:offsets[-1]]
+            offsets = offsets - offsets[0]
+        return cls(coords, offsets.astype(np.int64, copy=False))
+
+
+def _parse_row_slow(text):
+    return [(float(lon), float(lat)) for lon, lat in _WKT_PAIR.findall(text)]
+
+
+# ASCII 행들을 구분자로 이어 붙인 바이트 버퍼에서 [0-9.] 연속 구간을 숫자 토큰으로 잘라낸다.
+# 모든 토큰이 \d+\.\d+ 형태이고, 짝수 번째 토큰 바로 뒤가 공백 한 칸 + 다음 토큰인 행은
+# 정규식 결과와 정확히 같은 좌표쌍이 되므로 한 번에 변환한다.
+# 반환값: (행별 좌표쌍 개수, 행 순서대로 이어진 (경도, 위도) 배열, 정규식으로 다시 볼 행 마스크)
+def _parse_chunk(texts):
+    n_rows = len(texts)
+    lengths = np.fromiter((len(t) for t in texts), dtype=np.int64,
+                          count=n_rows)
+    row_starts = np.zeros(n_rows + 1, dtype=np.int64)
+    np.cumsum(lengths + 1, out=row_starts[1:])
+    # 앞뒤에 구분자를 두어 토큰이 버퍼 경계에 걸치지 않게 한다.
+    row_starts += 1
+    buf = np.frombuffer(
+        (_ROW_SEPARATOR + _ROW_SEPARATOR.join(texts) +
+         _ROW_SEPARATOR).encode('ascii'),
+        dtype=np.uint8)
+
+    is_dot = buf == ord('.')
+    numeric = (buf - ord('0') < 10) | is_dot
+    starts = np.flatnonzero(numeric[1:] > numeric[:-1]) + 1
+    ends = np.flatnonzero(numeric[:-1] > numeric[1:]) + 1
+    n_tokens = len(starts)
+
+    # 토큰마다 소수점이 정확히 하나, 양쪽에 숫자가 있어야 한다.
+    dots = np.flatnonzero(is_dot)
+    dot_token = np.searchsorted(starts, dots, side='right') - 1
+    dot_count = np.bincount(dot_token, minlength=n_tokens)
+    inner_dot = (dots > starts[dot_token]) & (dots < ends[dot_token] - 1)
+    bad_dot = np.bincount(dot_token[~inner_dot], minlength=n_tokens) > 0
+    token_ok = (dot_count == 1) & ~bad_dot
+
+    token_row = np.searchsorted(row_starts, starts, side='right') - 1
+    tokens_per_row = np.bincount(token_row, minlength=n_rows)
+    first_token = np.zeros(n_rows, dtype=np.int64)
+    np.cumsum(tokens_per_row[:-1], out=first_token[1:])
+    position = np.arange(n_tokens) - first_token[token_row]
+
+    # 짝수 번째 토큰(경도)은 공백 한 칸을 사이에 두고 같은 행의 다음 토큰(위도)과 붙어 있어야 한다.
+    is_first = position % 2 == 0
+    lead = np.flatnonzero(is_first)
+    has_next = lead + 1 < n_tokens
+    paired = np.zeros(len(lead), dtype=bool)
+    nxt = lead[has_next] + 1
+    paired[has_next] = ((token_row[nxt] == token_row[lead[has_next]])
+                        & (starts[nxt] == ends[lead[has_next]] + 1)
+                        & _IS_SPACE[buf[ends[lead[has_next]]]])
+    token_ok[lead[~paired]] = False
+
+    slow_rows = np.bincount(token_row[~token_ok], minlength=n_rows) > 0
+    slow_rows |= tokens_per_row % 2 == 1
+
+    # 토큰 바이트만 모으면 토큰들이 빈틈없이 이어지므로 Arrow 문자열 배열로 만들어 한 번에 변환한다.
+    token_lengths = ends - starts
+    token_offsets = np.zeros(n_tokens + 1, dtype=np.int64)
+    np.cumsum(token_lengths, out=token_offsets[1:])
+    strings = pa.LargeStringArray.from_buffers(n_tokens,
+                                               pa.py_buffer(token_offsets),
+                                               pa.py_buffer(buf[numeric]))
+    keep = ~slow_rows[token_row]
+    values = strings.filter(pa.array(keep)).cast(pa.float64())
+    pairs = values.to_numpy(zero_copy_only=False).reshape(-1, 2)
+    counts = np.where(slow_rows, 0, tokens_per_row // 2)
+    return counts, pairs, slow_rows
+
+
+# '공간위치G' 컬럼의 WKT 문자열들을 한 번에 파싱한다.
+# 반환값: (좌표가 하나라도 있는 행들의 RaggedCoords, 행별 유효 여부 마스크)
+def parse_linestrings(texts, dtype=np.float64):
+    texts = [t if isinstance(t, str) else '' for t in texts]
+    ascii_rows = np.fromiter((t.isascii() and _ROW_SEPARATOR not in t
+                              for t in texts),
+                             dtype=bool,
+                             count=len(texts))
+
+    counts = np.zeros(len(texts), dtype=np.int64)
+    chunk_pairs = []
+    slow_rows = ~ascii_rows
+    vector_rows = np.flatnonzero(ascii_rows)
+    # 버퍼가 너무 커지지 않도록 일정 크기씩 나눠 처리한다.
+    chunk = []
+    chunk_size = 0
+    for i in vector_rows.tolist() + [None]:
+        if i is not None:
+            chunk.append(i)
+            chunk_size += len(texts[i])
+            if chunk_size < _CHUNK_BYTES: continue
+        if not chunk: break
+        chunk_counts, pairs, chunk_slow = _parse_chunk(
+            [texts[j] for j in chunk])
+        counts[chunk] = chunk_counts
+        slow_rows[chunk] = chunk_slow
+        chunk_pairs.append(pairs)
+        chunk, chunk_size = [], 0
+
+    slow_pairs = {}
+    for i in np.flatnonzero(slow_rows).tolist():
+        slow_pairs[i] = _parse_row_slow(texts[i])
+        counts[i] = len(slow_pairs[i])
+
+    valid = counts > 0
+    offsets = np.zeros(int(valid.sum()) + 1, dtype=np.int64)
+    np.cumsum(counts[valid], out=offsets[1:])
+    # WKT는 (경도 위도) 순서이므로 지도에서 쓰는 [위도, 경도]로 바꾼다.
+    coords = np.empty((offsets[-1], 2), dtype=dtype)
+    if slow_pairs:
+        row_offsets = np.zeros(len(texts) + 1, dtype=np.int64)
+        np.cumsum(counts, out=row_offsets[1:])
+        fast = np.repeat(~slow_rows, counts)
+        if chunk_pairs:
+            coords[fast] = np.concatenate(chunk_pairs)[:, ::-1]
+        for i, pairs in slow_pairs.items():
+            if pairs:
+                coords[row_offsets[i]:row_offsets[i + 1]] = np.asarray(
+                    pairs)[:, ::-1]
+    elif chunk_pairs:
+        coords[:] = np.concatenate(chunk_pairs)[:, ::-1]
+    return RaggedCoords(coords, offsets), valid
+
+
+# --- 선 단순화 (Douglas-Peucker) ---
+# 모든 케이블을 한꺼번에 처리한다. 아직 나눌 구간(시작점, 끝점)들을 배열로 들고,
+# 단계마다 모든 구간의 안쪽 점에서 가장 먼 점을 찾아 허용 오차를 넘으면 그 점에서 나눈다.
+# 각 케이블의 양 끝점은 항상 남겨 케이블끼리 이어지는 지점이 어긋나지 않게 한다.
+_METERS_PER_DEG_LAT = 110540.0
+_METERS_PER_DEG_LON = 111320.0
+
+
+def _to_local_meters(coords):
+    lat0 = np.deg2rad(np.nanmean(coords[:, 0])) if len(coords) else 0.0
+    return np.column_stack([
+        coords[:, 1] * _METERS_PER_DEG_LON * np.cos(lat0),
+        coords[:, 0] * _METERS_PER_DEG_LAT
+    ])
+
+
+def _segment_distance(p, a, b):
+    ab = b - a
+    ap = p - a
+    denom = np.einsum('ij,ij->i', ab, ab)
+    t = np.divide(np.einsum('ij,ij->i', ap, ab),
+                  denom,
+                  out=np.zeros(len(p)),
+                  where=denom > 0)
+    t = np.clip(t, 0.0, 1.0)
+    return np.hypot(*(ap - ab * t[:, None]).T)
+
+
+def simplify(ragged, tolerance_m):
+    if tolerance_m <= 0 or len(ragged.coords) == 0:
+        return ragged
+    xy = _to_local_meters(ragged.coords)
+    starts, ends = ragged.offsets[:-1], ragged.offsets[1:] - 1
+    keep = np.zeros(len(xy), dtype=bool)
+    nonempty = ends >= starts
+    keep[starts[nonempty]] = True
+    keep[ends[nonempty]] = True
+
+    lo, hi = starts[ends - starts > 1], ends[ends - starts > 1]
+    while len(lo):
+        counts = hi - lo - 1
+        range_id = np.repeat(np.arange(len(lo)), counts)
+        first = np.zeros(len(lo), dtype=np.int64)
+        np.cumsum(counts[:-1], out=first[1:])
+        point = lo[range_id] + 1 + np.arange(counts.sum()) - first[range_id]
+
+        dist = _segment_distance(xy[point], xy[lo[range_id]], xy[hi[range_id]])
+        max_dist = np.maximum.reduceat(dist, first)
+        # 구간마다 가장 먼 점(같은 거리면 앞쪽)을 고른다.
+        is_max = np.flatnonzero(dist == max_dist[range_id])
+        _, first_max = np.unique(range_id[is_max], return_index=True)
+        split = point[is_max[first_max]]
+
+        over = max_dist > tolerance_m
+        keep[split[over]] = True
+        lo, hi, split = lo[over], hi[over], split[over]
+        lo, hi = np.concatenate([lo, split]), np.concatenate([split, hi])
+        longer = hi - lo > 1
+        lo, hi = lo[longer], hi[longer]
+
+    kept_per_line = np.add.reduceat(keep, starts) if len(starts) else []
+    kept_per_line = np.where(nonempty, kept_per_line, 0)
+    offsets = np.zeros(len(ragged) + 1, dtype=np.int64)
+    np.cumsum(kept_per_line, out=offsets[1:])
+    return RaggedCoords(ragged.coords[keep], offsets)
@@ -0,0 +1,120 @@
+# --- 단계별 실행 시간/용량 계측 ---
+# 화면을 한 번 그릴 때(rerun)마다 단계별 소요 시간과 캐시 적중 여부, 그린 요소 수,
+# 전송 용량을 RunTrace에 기록한다. 기록은 JSON 한 줄로 로그('dashboard.metrics')에 남기고,
+# 프로세스 전체의 단계별 최근 기록(StageMetrics)에 더해 p50/p95를 계산한다.
+# DASHBOARD_METRICS_LOG 환경 변수에 파일 경로를 주면 같은 기록을 JSONL 파일로도 내보낸다.
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+DEFAULT_WINDOW = 200
+
+logger = logging.getLogger('dashboard.metrics')
+_local = threading.local()
+_log_lock = threading.Lock()
+
+
+# 캐시된 함수 본문 맨 앞에서 부른다. 본문은 캐시를 못 찾았을 때만 실행되므로,
+# RunTrace.call 중에 이 표시가 남으면 그 호출은 캐시 미스다.
+def note_cache_miss():
+    misses = getattr(_local, 'misses', None)
+    if misses is not None:
+        misses.append(True)
+
+
+class RunTrace:
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._last = self.started
+        self.records = []
+
+    def _add(self, stage, started, info):
+        now = time.perf_counter()
+        record = {'stage': stage, 'ms': (now - started) * 1000, **info}
+        self.records.append(record)
+        self._last = now
+        return record
+
+    # 직전 기록 이후 지금까지를 stage 단계로 기록한다. 반환한 dict에 값을 더 넣을 수 있다.
+    def lap(self, stage, **info):
+        return self._add(stage, self._last, info)
+
+    # func(*args)를 실행하며 시간과 캐시 적중 여부('hit' | 'miss')를 기록한다.
+    def call(self, stage, func, *args, **info):
+        if self._pending(): self.lap('기타')
+        previous = getattr(_local, 'misses', None)
+        _local.misses = []
+        started = time.perf_counter()
+        try:
+            result = func(*args)
+        finally:
+            missed = bool(_local.misses)
+            _local.misses = previous
+            if previous is not None and missed:
+                previous.append(True)
+        self._add(stage, started, {'cache': 'miss' if missed else 'hit', **info})
+        return result
+
+    # 0.5ms 이상 기록되지 않은 구간이 있으면 '기타'로 남긴다.
+    def _pending(self):
+        return (time.perf_counter() - self._last) * 1000 >= 0.5
+
+    @property
+    def total_ms(self):
+        return (self._last - self.started) * 1000
+
+    # outcome: 'ok' | 'rerun'(st.rerun()으로 중간에 끝난 실행) | 'stopped' | 'error'
+    def finish(self, metrics=None, outcome='ok'):
+        if self._pending(): self.lap('기타')
+        entry = {
+            'time': time.time(),
+            'outcome': outcome,
+            'total_ms': round(self.total_ms, 2),
+            'stages': [{
+                key: round(value, 2) if isinstance(value, float) else value
+                for key, value in record.items()
+            } for record in self.records]
+        }
+        logger.info(json.dumps(entry, ensure_ascii=False))
+        path = os.environ.get('DASHBOARD_METRICS_LOG')
+        if path:
+            with _log_lock, open(path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        if metrics is not None:
+            metrics.add(self)
+        return entry
+
+
+# 단계별 최근 window번의 소요 시간. 여러 세션이 함께 쓴다.
+class StageMetrics:
+
+    def __init__(self, window=DEFAULT_WINDOW):
+        self.window = window
+        self._history = {}
+        self._lock = threading.Lock()
+
+    def add(self, trace):
+        with self._lock:
+            total = {'stage': '전체', 'ms': trace.total_ms}
+            for record in trace.records + [total]:
+                history = self._history.setdefault(
+                    record['stage'], deque(maxlen=self.window))
+                history.append(record['ms'])
+
+    def summary(self):
+        with self._lock:
+            snapshot = {stage: list(history)
+                        for stage, history in self._history.items()}
+        return [{
+            '단계': stage,
+            '횟수': len(values),
+            'p50(ms)': round(float(np.percentile(values, 50)), 1),
+            'p95(ms)': round(float(np.percentile(values, 95)), 1),
+            '최근(ms)': round(values[-1], 1),
+        } for stage, values in snapshot.items()]
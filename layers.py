@@ -0,0 +1,417 @@
+# --- 지도 레이어 미리 만들기 ---
+# 광케이블은 케이블마다 GeoJSON 피처 문자열을 데이터 버전마다 한 번만 만들어 두고,
+# 화면을 다시 그릴 때는 보여줄 케이블(선택된 읍면동, 화면 범위 안)의 문자열만 이어 붙인다.
+# (행마다 folium.PolyLine을 만들고 매번 JSON으로 직렬화하는 비용을 없앤다)
+# 또한 확대 수준별로 단순화한 여러 단계를 함께 만들어, 지도 확대 수준에 맞는 단계만 보낸다.
+# 마커 팝업은 HTML을 마커마다 싣지 않고, 레이어별 내용 표(JSON)를 한 번 싣은 뒤
+# 마커를 클릭했을 때 국소 ID로 표에서 찾아 만든다.
+# 국소 마커도 행마다 folium 객체를 만들지 않고, 레이어마다 컬럼형 배열(JSON) 하나와
+# 브라우저 쪽 공용 스타일 함수로 그린다.
+import json
+import math
+
+import folium
+import numpy as np
+import pandas as pd
+from branca.element import Element, MacroElement
+from folium.map import Layer
+from folium.template import Template
+
+from geometry import simplify
+
+EMD_COLUMN = '읍면동명'
+CABLE_STYLE = {'color': 'red', 'weight': 2.5}
+RECOVERY_COLORS = {'복구': 'blue', '미복구': 'red'}
+PROGRESS_PULSE_COLORS = {
+    '현장확인': '#28a745',
+    '작업완료': '#9370DB',
+    '진행중': '#007bff'
+}
+
+# 케이블 단순화 단계: 각 값은 그 줌 이하에서 쓰는 단계이고, None은 원본 좌표.
+# 허용 오차는 해당 줌에서 화면 0.5픽셀에 해당하는 거리(가평 위도 기준)로 잡는다.
+LOD_TIERS = (10, 12, 14, 16, None)
+LOD_REFERENCE_LAT = 37.8
+
+
+def lod_tolerance_m(tier):
+    if tier is None: return 0.0
+    meters_per_pixel = 156543.03392 * math.cos(
+        math.radians(LOD_REFERENCE_LAT)) / 2**tier
+    return 0.5 * meters_per_pixel
+
+
+def lod_tier_for_zoom(zoom):
+    for tier in LOD_TIERS:
+        if tier is None or zoom <= tier:
+            return tier
+
+
+# 미리 직렬화된 GeoJSON 문자열을 그대로 싣는 레이어.
+# 각 피처의 properties.tooltip이 있으면 마우스를 올렸을 때 보여준다.
+class PrebuiltGeoJson(Layer):
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+        var {{ this.get_name() }} = L.geoJson({{ this.data_json }}, {
+            style: {{ this.style|tojson }},
+            onEachFeature: function(feature, layer) {
+                if (feature.properties && feature.properties.tooltip) {
+                    layer.bindTooltip(feature.properties.tooltip, {sticky: true});
+                }
+            }
+        });
+        {% endmacro %}
+        """)
+
+    def __init__(self, data_json, style=None, name=None, overlay=True,
+                 control=True, show=True):
+        super().__init__(name=name, overlay=overlay, control=control,
+                         show=show)
+        self._name = 'PrebuiltGeoJson'
+        self.data_json = data_json
+        self.style = style or {}
+
+
+# 팝업 내용 표: {'fields': [항목명, ...], 'rows': {국소 ID: [값, ...]}}
+# fields는 (항목명, 컬럼명) 목록이며, 없는 컬럼은 '정보 없음'으로 채운다.
+def build_popup_table(df, fields):
+    values = [
+        df[column].astype(object).map(str).tolist()
+        if column in df.columns else ['정보 없음'] * len(df)
+        for _, column in fields
+    ]
+    return json.dumps(
+        {
+            'fields': [label for label, _ in fields],
+            'rows': dict(zip(map(str, df.index), map(list, zip(*values))))
+        },
+        ensure_ascii=False,
+        separators=(',', ':'))
+
+
+# 팝업 내용 표를 지도에 한 번 싣는다. 기본 지도에 붙여 두면 세션 동안 다시 보내지 않는다.
+class PopupTable(MacroElement):
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+        window.popupTables = window.popupTables || {};
+        window.popupTables[{{ this.table_name|tojson }}] = {{ this.data_json }};
+        window.renderPopup = function(tableName, id, extra) {
+            var table = window.popupTables[tableName];
+            var values = table && table.rows[id];
+            if (!values) return '';
+            var escape = function(v) {
+                return String(v).replace(/&/g, '&amp;').replace(/</g, '&lt;')
+                                .replace(/>/g, '&gt;');
+            };
+            var lines = table.fields.map(function(field, i) {
+                return '<b>' + escape(field) + ':</b> ' + escape(values[i]);
+            });
+            (extra || []).forEach(function(item) {
+                lines.push('<b>' + escape(item[0]) + ':</b> ' + escape(item[1]));
+            });
+            return lines.join('<br>');
+        };
+        {% endmacro %}
+        """)
+
+    def __init__(self, table_name, data_json):
+        super().__init__()
+        self._name = 'PopupTable'
+        self.table_name = table_name
+        self.data_json = data_json
+
+
+# 국소 마커 스타일: 레이어 이름별 (속성, 좌표) -> Leaflet 레이어 함수와 공용 CSS.
+# 기본 지도에 한 번 붙여 두고 모든 마커 레이어가 함께 쓴다.
+class MarkerStyles(MacroElement):
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+        if (!document.getElementById('station-marker-css')) {
+            var css = document.createElement('style');
+            css.id = 'station-marker-css';
+            css.textContent = {{ this.css|tojson }};
+            document.head.appendChild(css);
+        }
+        window.markerStyles = {
+            recovery: function(properties, latlng) {
+                var status = properties['복구상태'];
+                var colors = {{ this.recovery_colors|tojson }};
+                var nearCable = properties['케이블 근접'] === true;
+                return L.circleMarker(latlng, {
+                    radius: 7,
+                    color: nearCable ? '#8a2be2' : (status === '미복구' ? 'yellow' : 'white'),
+                    weight: nearCable ? 3 : 2,
+                    fill: true,
+                    fillColor: colors[status] || 'gray',
+                    fillOpacity: 1.0
+                });
+            },
+            progress: function(properties, latlng) {
+                var pulses = {{ this.pulse_classes|tojson }};
+                var division = String(properties['구분'] || '');
+                var pulse = pulses[properties['진행여부']];
+                if (division.indexOf('이동기지국') !== -1) {
+                    return L.marker(latlng, {icon: L.divIcon({
+                        html: '<div class="station-antenna">📡</div>',
+                        className: '', iconSize: [30, 30], iconAnchor: [15, 15]
+                    })});
+                }
+                if (pulse) {
+                    return L.marker(latlng, {icon: L.divIcon({
+                        html: '<div class="station-pulse ' + pulse + '"></div>',
+                        className: '', iconSize: [24, 24], iconAnchor: [12, 12]
+                    })});
+                }
+                return L.marker(latlng, {icon: L.AwesomeMarkers.icon({
+                    icon: 'info-sign', iconColor: 'white', markerColor: 'gray',
+                    prefix: 'glyphicon'
+                })});
+            }
+        };
+        {% endmacro %}
+        """)
+
+    def __init__(self):
+        super().__init__()
+        self._name = 'MarkerStyles'
+        self.recovery_colors = RECOVERY_COLORS
+        self.pulse_classes = {
+            status: f"station-pulse-{i}"
+            for i, status in enumerate(PROGRESS_PULSE_COLORS)
+        }
+        rules = [
+            '.station-antenna{font-size:24px;}',
+            '.station-pulse{width:24px;height:24px;border-radius:50%;'
+            'border:2px solid white;position:relative;top:-12px;left:-12px;}'
+        ]
+        for i, color in enumerate(PROGRESS_PULSE_COLORS.values()):
+            rules.append(
+                f".station-pulse-{i}{{background-color:{color};"
+                f"box-shadow:0 0 8px {color};"
+                f"animation:station-pulse-{i} 1.5s infinite;}}"
+                f"@keyframes station-pulse-{i}{{"
+                f"0%{{transform:scale(0.8);box-shadow:0 0 0 0 {color}aa}}"
+                f"70%{{transform:scale(1.2);box-shadow:0 0 10px 10px {color}00}}"
+                f"100%{{transform:scale(0.8);box-shadow:0 0 0 0 {color}00}}}}")
+        self.css = ''.join(rules)
+
+
+# 마커 레이어 데이터: {'id': [...], 'lat': [...], 'lon': [...], 'props': {컬럼: [...]}}
+# props 값이 스칼라이면(없는 컬럼의 기본값 등) 모든 마커에 같은 값을 쓰고, 결측값은 null로 보낸다.
+def build_marker_data(ids, lat, lon, props):
+    ids = [str(i) for i in ids]
+    return json.dumps(
+        {
+            'id': ids,
+            'lat': np.asarray(lat, dtype=float).tolist(),
+            'lon': np.asarray(lon, dtype=float).tolist(),
+            'props': {
+                name: _json_values(values, len(ids))
+                for name, values in props.items()
+            }
+        },
+        ensure_ascii=False,
+        separators=(',', ':'))
+
+
+def _json_values(values, n):
+    if values is None or np.isscalar(values):
+        return [values] * n
+    values = pd.Series(values, dtype=object)
+    return values.where(values.notna(), None).tolist()
+
+
+# 컬럼형 배열 하나로 그리는 마커 레이어. style_name은 MarkerStyles의 스타일 함수,
+# popup_table은 팝업 내용 표 이름이며, popup_extra의 (항목명, 속성명)은 표 뒤에 덧붙인다.
+class MarkerLayer(Layer):
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+        var {{ this.get_name() }} = L.featureGroup();
+        (function(group, data) {
+            var style = window.markerStyles[{{ this.style_name|tojson }}];
+            var extras = {{ this.popup_extra|tojson }};
+            var names = Object.keys(data.props);
+            data.id.forEach(function(id, i) {
+                var properties = {};
+                names.forEach(function(name) {
+                    properties[name] = data.props[name][i];
+                });
+                var layer = style(properties, L.latLng(data.lat[i], data.lon[i]));
+                var extra = extras.map(function(item) {
+                    return [item[0], properties[item[1]]];
+                });
+                layer.bindPopup(function() {
+                    return renderPopup({{ this.popup_table|tojson }}, id, extra);
+                }, {{ this.popup_options|tojson }});
+                group.addLayer(layer);
+            });
+        })({{ this.get_name() }}, {{ this.data_json }});
+        {% endmacro %}
+        """)
+
+    def __init__(self, data_json, style_name, popup_table, popup_extra=(),
+                 max_width=300, name=None, overlay=True, control=False,
+                 show=True):
+        super().__init__(name=name, overlay=overlay, control=control,
+                         show=show)
+        self._name = 'MarkerLayer'
+        self.data_json = data_json
+        self.style_name = style_name
+        self.popup_table = popup_table
+        self.popup_extra = [list(item) for item in popup_extra]
+        self.popup_options = {'maxWidth': max_width}
+
+
+# folium 요소 이름에는 무작위 id가 붙어, 같은 내용이어도 지도 스크립트가 매번 달라진다.
+# 오버레이 안 요소(팝업 내용 포함)의 id를 순서대로 다시 매겨 내용이 같으면 같은 스크립트가 되게 한다.
+# streamlit-folium이 변수 이름을 바꿔 쓸 때 id를 영숫자 한 덩어리로 가정하므로
+# prefix와 새 id에는 밑줄을 쓰지 않는다.
+def with_stable_ids(element, prefix):
+    _restamp_children(element, prefix)
+    for attr in ('html', 'script'):
+        part = getattr(element, attr, None)
+        if isinstance(part, Element):
+            _restamp_children(part, f"{prefix}{attr}")
+    return element
+
+
+def _restamp_children(container, prefix):
+    children = list(container._children.values())
+    container._children.clear()
+    for i, child in enumerate(children):
+        child._id = f"{prefix}x{i}"
+        container._children[child.get_name()] = child
+        with_stable_ids(child, child._id)
+
+
+# 케이블별 GeoJSON 피처 문자열 배열(object). 툴팁은 읍면동명, 없으면 '광케이블'.
+def build_cable_features(df_cable, cable_coords):
+    if EMD_COLUMN in df_cable.columns:
+        names = df_cable[EMD_COLUMN].astype(object).where(
+            df_cable[EMD_COLUMN].notna(), '광케이블')
+    else:
+        names = pd.Series('광케이블', index=df_cable.index)
+    tooltips = {
+        name: json.dumps(str(name), ensure_ascii=False)
+        for name in names.unique()
+    }
+    # GeoJSON 좌표 순서는 [경도, 위도]
+    lonlat = cable_coords.coords[:, ::-1]
+    offsets = cable_coords.offsets
+    features = np.empty(len(cable_coords), dtype=object)
+    for i, name in enumerate(names):
+        coordinates = json.dumps(lonlat[offsets[i]:offsets[i + 1]].tolist(),
+                                 separators=(',', ':'))
+        features[i] = (
+            f'{{"type":"Feature","properties":{{"tooltip":{tooltips[name]}}},'
+            f'"geometry":{{"type":"LineString","coordinates":{coordinates}}}}}')
+    return features
+
+
+# 피처 문자열들을 FeatureCollection 문자열 하나로 잇는다.
+def feature_collection(features):
+    return ('{"type":"FeatureCollection","features":[' + ','.join(features) +
+            ']}')
+
+
+# 단계별 {'features': 케이블별 피처 문자열, 'vertices': 점 개수, 'bytes': 전체 GeoJSON 용량,
+# 'tolerance_m': 허용 오차}를 한 번에 만든다.
+def build_cable_pyramid(df_cable, cable_coords):
+    pyramid = {}
+    for tier in LOD_TIERS:
+        tolerance_m = lod_tolerance_m(tier)
+        simplified = simplify(cable_coords, tolerance_m)
+        features = build_cable_features(df_cable, simplified)
+        pyramid[tier] = {
+            'features': features,
+            'vertices': len(simplified.coords),
+            'bytes': sum(len(v.encode('utf-8')) for v in features),
+            'tolerance_m': tolerance_m,
+        }
+    return pyramid
+
+
+# --- 기본 지도와 오버레이 ---
+# 대시보드와 일괄 내보내기가 같은 지도 구성(타일, 팝업 표, 마커 스타일, 오버레이 이름)을 쓴다.
+MAP_CENTER = [37.8313, 127.5095]
+MAP_ZOOM = 11
+MAP_OVERLAYS = ('클러스터 영역', '광케이블', '국소', '진행 현황')
+RECOVERY_POPUP_FIELDS = (('국소명', '국소명'), ('주소', '주소'), ('복구 상태', '복구상태'),
+                         ('장비 종류', 'RU / 중계기=>중계기 종류'),
+                         ('공동망 구분', '공동망구분'),
+                         ('점검 내역', '점검내역(정전/선로불량/유니트)'))
+CLUSTER_STYLE = {
+    'fillColor': 'yellow',
+    'color': 'orange',
+    'weight': 2,
+    'fillOpacity': 0.3
+}
+
+
+# 진행 현황 팝업에는 좌표 컬럼을 뺀 모든 컬럼을 보여준다.
+def progress_popup_fields(df):
+    return tuple((column, column) for column in df.columns
+                 if column not in ['latitude_dd', 'longitude_dd', '위경도'])
+
+
+# 팝업 내용 표와 마커 스타일은 기본 지도에 실어, 데이터가 바뀌지 않는 한 한 번만 보낸다.
+def build_base_map(popup_tables, location=MAP_CENTER, zoom_start=MAP_ZOOM):
+    m = folium.Map(location=location, zoom_start=zoom_start)
+    MarkerStyles().add_to(m)
+    for table_name, data_json in popup_tables.items():
+        PopupTable(table_name, data_json).add_to(m)
+    folium.TileLayer('CartoDB positron', name='일반 지도').add_to(m)
+    folium.TileLayer(
+        'https://server.arcgisonline.com/ArcGIS/rest/services/World_Imagery/MapServer/tile/{z}/{y}/{x}',
+        attr='Esri',
+        name='위성 지도').add_to(m)
+    return m
+
+
+# 오버레이는 항상 같은 이름과 순서로 만든다.
+def overlay_groups():
+    return {name: folium.FeatureGroup(name=name) for name in MAP_OVERLAYS}
+
+
+def add_cluster_areas(geojson, group):
+    folium.GeoJson(geojson,
+                   name='클러스터 영역',
+                   style_function=lambda x: CLUSTER_STYLE).add_to(group)
+
+
+# 복구 국소 마커 데이터. 주소 기반 좌표가 있으면 그것을, 없으면 엑셀의 DMS 좌표를 쓴다.
+# near_cable(국소별 bool)을 주면 광케이블 근접 국소를 테두리로 표시한다.
+def recovery_marker_data(df, near_cable=None):
+    geocoded = df['geocoded_lat'].notna()
+    props = {
+        '복구상태': df.get('복구상태', '정보 없음'),
+        '위치정보 소스': geocoded.map({
+            True: "주소기반",
+            False: "엑셀좌표(DMS)"
+        })
+    }
+    if near_cable is not None:
+        props['케이블 근접'] = near_cable
+    return build_marker_data(df.index,
+                             df['geocoded_lat'].fillna(df['latitude_dd']),
+                             df['geocoded_lon'].fillna(df['longitude_dd']),
+                             props)
+
+
+def recovery_marker_layer(data_json):
+    return MarkerLayer(data_json,
+                       'recovery',
+                       'recovery',
+                       popup_extra=[('위치정보 소스', '위치정보 소스')],
+                       max_width=300)
+
+
+def progress_marker_data(df):
+    return build_marker_data(df.index, df['latitude_dd'], df['longitude_dd'], {
+        '구분': df.get('구분', ""),
+        '진행여부': df.get('진행여부')
+    })
+
+
+def progress_marker_layer(data_json):
+    return MarkerLayer(data_json, 'progress', 'progress', max_width=400)
@@ -0,0 +1,288 @@
+# --- 입력 파일 로더 (Streamlit 없이 쓰는 부분) ---
+# 대시보드(app.py)와 일괄 내보내기(export.py)가 함께 쓰는 엑셀/GeoJSON 읽기와 가공.
+# 각 로더는 파싱/가공 결과를 스냅샷으로 남겨 두고, 원본 엑셀이 바뀌었을 때만 다시 읽는다.
+# 스냅샷 이름과 가공 버전이 같으므로 대시보드가 만든 스냅샷을 내보내기에서도 그대로 쓴다.
+# 읽기 오류는 report(메시지)로 알리고 None을 돌려준다. (대시보드는 st.error를 넘긴다)
+import logging
+import os
+
+import pandas as pd
+
+from clusters import read_cluster_geojson
+from coords import parse_dms, parse_latlon
+from geocache import normalize_address
+from geocoding import geocoded_frame
+from geometry import RaggedCoords, parse_linestrings
+from layers import EMD_COLUMN
+from snapshot import file_fingerprint, load_with_snapshot
+from workbook import iter_sheet_chunks, read_sheets
+
+CABLE_FILE = "광케이블가평.xlsx"
+RECOVERY_FILE = "복구미복구국소.xlsx"
+PROGRESS_FILE = "진행현황.xlsx"
+CLUSTER_FILE = "클러스터.geojson"
+
+logger = logging.getLogger('dashboard.loaders')
+
+
+# --- 광케이블 ---
+# 엑셀은 workbook 모듈로 파일마다 한 번 열고, 로더마다 쓰는 컬럼만 읽는다.
+CABLE_COLUMNS = [EMD_COLUMN, '공간위치G']
+
+
+def load_cable(filename, report=logger.error):
+    return load_with_snapshot(filename,
+                              'cable',
+                              lambda: read_cable_data(filename, report),
+                              version='3')
+
+
+# 큰 시트이므로 조각 단위로 읽으면서 바로 좌표를 파싱한다.
+def read_cable_data(filename, report=logger.error):
+    frames, coords = [], []
+    try:
+        for chunk in iter_sheet_chunks(filename, 0, CABLE_COLUMNS):
+            # 좌표는 행별 리스트 대신 하나의 연속 배열(RaggedCoords)로 파싱한다.
+            if '공간위치G' not in chunk.columns: return None
+            chunk_coords, valid = parse_linestrings(chunk['공간위치G'])
+            frames.append(chunk.loc[valid].drop(columns=['공간위치G']))
+            coords.append(chunk_coords)
+    except Exception as e:
+        report(f"'{filename}' 읽기 오류: {e}")
+        return None
+
+    # 반환하는 df의 i번째 행이 cable_coords[i] 케이블에 대응한다.
+    df = pd.concat(frames, ignore_index=True)
+    cable_coords = RaggedCoords.concat(coords)
+    return df, cable_coords
+
+
+# --- 복구 상태 ---
+# 시트가 바뀌면 이전 스냅샷과 비교해 추가/변경된 행만 다시 가공한다(시설코드 기준으로 집계).
+RECOVERY_COLUMNS = [
+    '국소명', '주소', '지역', '시설코드', '복구상태', 'RU / 중계기=>중계기 종류', '공동망구분',
+    '점검내역(정전/선로불량/유니트)', '경도', '위도'
+]
+
+
+def load_recovery(filename, report=logger.error):
+    return load_with_snapshot(filename,
+                              'recovery',
+                              lambda: read_recovery_status_data(filename, report),
+                              version='4',
+                              parse=parse_recovery_status_data,
+                              key='시설코드')
+
+
+def read_recovery_status_data(filename, report=logger.error):
+    try:
+        return read_sheets(filename, {0: RECOVERY_COLUMNS})[0]
+    except Exception as e:
+        report(f"'{filename}' 읽기 오류: {e}")
+        return None
+
+
+def parse_recovery_status_data(df):
+    # 주소 지오코딩은 로딩을 막지 않도록 따로(대시보드는 백그라운드 작업으로) 하고,
+    # 여기서는 조회에 쓸 정규화된 주소 키만 만들어 둔다.
+    ADDRESS_COLUMN = '주소'
+    if ADDRESS_COLUMN in df.columns:
+        df['geocode_key'] = df[ADDRESS_COLUMN].map(normalize_address)
+    else:
+        df['geocode_key'] = None
+    df['geocoded_lat'] = float('nan')
+    df['geocoded_lon'] = float('nan')
+
+    LAT_DATA_COLUMN = '경도'
+    LON_DATA_COLUMN = '위도'
+
+    if LAT_DATA_COLUMN in df.columns and LON_DATA_COLUMN in df.columns:
+        df['latitude_dd'], _ = parse_dms(df[LAT_DATA_COLUMN])
+        df['longitude_dd'], _ = parse_dms(df[LON_DATA_COLUMN])
+    else:
+        df['latitude_dd'] = None
+        df['longitude_dd'] = None
+
+    df_valid = df[df['geocode_key'].notna() |
+                  (df['latitude_dd'].notna()
+                   & df['longitude_dd'].notna())].copy()
+
+    return df_valid
+
+
+# 지금까지 지오코딩된 좌표를 붙이고, 어느 좌표도 없는 국소는 제외한다.
+def attach_geocoded_coords(df, results):
+    # assign은 기존 컬럼을 복사하지 않으므로 공유 데이터의 뷰에 좌표 컬럼만 새로 붙는다.
+    # 모든 국소에 좌표가 있으면 행을 거르지 않고 그대로 돌려준다.
+    df = df.assign(**geocoded_frame(df['geocode_key'], results))
+    located = ((df['geocoded_lat'].notna() & df['geocoded_lon'].notna()) |
+               (df['latitude_dd'].notna() & df['longitude_dd'].notna()))
+    return df if located.all() else df[located]
+
+
+# 국소별 표시 좌표: 주소 기반 좌표가 있으면 그것을, 없으면 엑셀의 DMS 좌표를 쓴다.
+def station_latlon(df):
+    return (df['geocoded_lat'].fillna(df['latitude_dd']).to_numpy(dtype=float),
+            df['geocoded_lon'].fillna(df['longitude_dd']).to_numpy(dtype=float))
+
+
+# 국소별 읍면동: '지역'(예: '경기 가평군 가평읍')에서 읍/면/동으로 끝나는 첫 단어.
+# '지역'에 번지나 설치 위치까지 들어간 행이 있으므로 마지막 단어를 쓰지 않는다.
+def recovery_emds(df):
+    if '지역' not in df.columns: return pd.Series(None, index=df.index)
+    return df['지역'].astype(object).str.extract(
+        r'(?:^|\s)(\S+[읍면동])(?=\s|$)', expand=False)
+
+
+# --- 진행 현황 ---
+# '진행현황.xlsx'의 두 시트(진행 현황, 'Sheet2' 중계기 현황)는 한 번 열어 함께 읽는다.
+# 진행 현황/중계기 로더는 read_workbook()으로 이 결과를 받으므로, 호출하는 쪽에서
+# 한 번만 읽도록 캐시해 넘기면 두 스냅샷이 모두 없을 때도 파일은 한 번만 읽힌다.
+def read_progress_workbook(filename, report=logger.error):
+    try:
+        return read_sheets(filename, {0: None, 'Sheet2': None})
+    except Exception as e:
+        report(f"'{filename}' 파일 읽기 오류: {e}")
+        return None
+
+
+def load_progress(filename, read_workbook=None, report=logger.error):
+    read_workbook = read_workbook or (
+        lambda: read_progress_workbook(filename, report))
+
+    def build():
+        sheets = read_workbook()
+        return sheets[0] if sheets else None
+
+    return load_with_snapshot(filename, 'progress', build)
+
+
+# 지도에 올릴 진행 현황: '위경도'를 미리 변환해 두어 화면을 다시 그릴 때는 파싱하지 않는다.
+# 현장에서 자주 고치는 시트이므로 추가/변경된 행의 좌표만 다시 변환한다.
+def load_progress_map(filename, df_progress):
+    if df_progress is None or '위경도' not in df_progress.columns: return None
+    return load_with_snapshot(filename,
+                              'progress-map',
+                              lambda: df_progress,
+                              parse=parse_progress_coords,
+                              key=['구분', '주소'])
+
+
+def parse_progress_coords(df):
+    lat, lon, valid = parse_latlon(df['위경도'])
+    return df.assign(latitude_dd=lat, longitude_dd=lon)[valid]
+
+
+def load_repeater(filename, read_workbook=None, report=logger.error):
+    read_workbook = read_workbook or (
+        lambda: read_progress_workbook(filename, report))
+
+    def build():
+        sheets = read_workbook()
+        if sheets is None: return None
+        if sheets['Sheet2'] is None:
+            report(f"'{filename}' 파일에서 'Sheet2' 시트를 읽는 중 오류가 발생했습니다. "
+                   "시트 이름이 정확한지 확인해주세요.")
+        return sheets['Sheet2']
+
+    return load_with_snapshot(filename, 'repeater', build)
+
+
+# --- 클러스터 영역 ---
+# '클러스터.geojson' 파일이 있으면 그 다각형을, 없으면 아래 기본 영역을 쓴다.
+# 반환값: (GeoJSON, 영역 버전). 버전은 클러스터 배정 결과를 캐시할 때 키로 쓴다.
+DEFAULT_CLUSTER_GEOJSON = {
+    "type":
+    "FeatureCollection",
+    "features": [{
+        "type": "Feature",
+        "properties": {},
+        "geometry": {
+            "coordinates": [[[127.2806953180476, 37.78729788838481],
+                             [127.2765499549609, 37.7771712447948],
+                             [127.29576936563382, 37.774788303497445],
+                             [127.34852853218655, 37.79280739100005],
+                             [127.37641552022086, 37.7916161819997],
+                             [127.3538044488406, 37.812906146199694],
+                             [127.3129160947625, 37.81007776322896],
+                             [127.28917446981495, 37.804867300456266],
+                             [127.2806953180476, 37.78729788838481]]],
+            "type":
+            "Polygon"
+        }
+    }, {
+        "type": "Feature",
+        "properties": {},
+        "geometry": {
+            "coordinates": [[[127.30114246707063, 37.83937277697714],
+                             [127.30281667537503, 37.826645709902834],
+                             [127.32939473223814, 37.81705763830212],
+                             [127.34174201849481, 37.82350492707792],
+                             [127.34153274245756, 37.83986859229668],
+                             [127.32855762808498, 37.85110617888827],
+                             [127.30825785237084, 37.8494537000242],
+                             [127.30114246707063, 37.83937277697714]]],
+            "type":
+            "Polygon"
+        }
+    }, {
+        "type": "Feature",
+        "properties": {},
+        "geometry": {
+            "coordinates": [[[127.35785627344296, 37.840860212937045],
+                             [127.3553449609833, 37.83176985807101],
+                             [127.3685293513953, 37.828959885397154],
+                             [127.40285062167248, 37.84119075018792],
+                             [127.41122166320247, 37.85837664589687],
+                             [127.4055712101694, 37.8720894383471],
+                             [127.36978500762501, 37.870272226993634],
+                             [127.35283364852381, 37.8514366702168],
+                             [127.35785627344296, 37.840860212937045]]],
+            "type":
+            "Polygon"
+        }
+    }, {
+        "type": "Feature",
+        "properties": {},
+        "geometry": {
+            "coordinates": [[[127.38208718030882, 37.789871082070206],
+                             [127.38456298052728, 37.77337845393433],
+                             [127.3948198671464, 37.75939876981431],
+                             [127.41674838336314, 37.76694812744792],
+                             [127.41922418358149, 37.79406353636617],
+                             [127.3891608952186, 37.82312467645714],
+                             [127.36369552154696, 37.81362517748403],
+                             [127.38208718030882, 37.789871082070206]]],
+            "type":
+            "Polygon"
+        }
+    }, {
+        "type": "Feature",
+        "properties": {},
+        "geometry": {
+            "coordinates": [[[127.51803924542475, 37.83135101098242],
+                             [127.51825739118652, 37.842377117042346],
+                             [127.51324003864227, 37.8523681020244],
+                             [127.49622466914303, 37.868385304016414],
+                             [127.4678657199762, 37.87837276434155],
+                             [127.45630399454893, 37.86804088468334],
+                             [127.44365154030442, 37.8523681020244],
+                             [127.44801445556118, 37.83307394869125],
+                             [127.48095446574649, 37.81963396756811],
+                             [127.51803924542475, 37.83135101098242]]],
+            "type":
+            "Polygon"
+        }
+    }]
+}
+
+
+def load_cluster_geojson(filename, report=logger.error):
+    if not os.path.exists(filename):
+        return DEFAULT_CLUSTER_GEOJSON, 'clusters-default'
+    try:
+        geojson = read_cluster_geojson(filename)
+    except (OSError, ValueError) as e:
+        report(f"'{filename}' 읽기 오류: {e}")
+        return DEFAULT_CLUSTER_GEOJSON, 'clusters-default'
+    return geojson, f"clusters-{file_fingerprint(filename)['sha256'][:16]}"
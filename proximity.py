@@ -0,0 +1,214 @@
+# --- 국소-광케이블 근접 분석 ---
+# 케이블을 선분(연속한 두 점) 단위로 쪼개 선분 경계 상자 격자 인덱스를 만든다.
+# 국소마다 자기 격자 칸에서 시작해 한 겹씩 바깥 고리(ring)의 칸을 보며 가장 가까운 선분을 찾고,
+# 지금까지 찾은 거리가 아직 보지 않은 칸까지의 최소 거리보다 가까워지면 멈춘다.
+# 한 겹을 넓힐 때마다 아직 끝나지 않은 국소들의 후보 선분을 한꺼번에 계산한다.
+# 후보 선분까지의 거리는 국소 기준 평면 좌표에서 재고,
+# 최종 거리는 가장 가까운 점까지의 haversine 거리(미터)로 다시 잰다.
+
+import threading
+
+import numpy as np
+import pandas as pd
+from haversine import Unit, haversine_vector
+
+from spatial_index import GridIndex
+
+METERS_PER_DEGREE = 111195.0
+DEFAULT_SEARCH_RADIUS_M = 2000.0
+MAX_PAIRS_PER_BLOCK = 1_000_000
+# 선분은 짧고 촘촘하므로 화면 범위 조회용 격자(가로세로 256칸)보다 잘게 나눈다.
+MAX_GRID_CELLS = 2048
+
+
+# 칸 (0, 0)에서 체비쇼프 거리가 r인 칸들의 (행, 열) 차이
+def _ring_offsets(r):
+    if r == 0: return np.zeros((1, 2), dtype=np.int64)
+    side = np.arange(-r, r + 1)
+    inner = side[1:-1]
+    return np.vstack([
+        np.column_stack([np.full(len(side), -r), side]),
+        np.column_stack([np.full(len(side), r), side]),
+        np.column_stack([inner, np.full(len(inner), -r)]),
+        np.column_stack([inner, np.full(len(inner), r)]),
+    ])
+
+
+class CableProximity:
+
+    def __init__(self, cable_coords):
+        coords = np.asarray(cable_coords.coords, dtype=float)
+        lengths = cable_coords.lengths
+        vertex_cable = np.repeat(np.arange(len(lengths)), lengths)
+        # 케이블 경계를 넘는 선분은 빼고, 점 하나짜리 케이블은 길이 0 선분으로 둔다.
+        starts = np.flatnonzero(
+            np.r_[vertex_cable[1:] == vertex_cable[:-1], False])
+        single = np.asarray(cable_coords.offsets[:-1])[lengths == 1]
+        self.start = coords[np.r_[starts, single]]
+        self.end = coords[np.r_[starts + 1, single]]
+        self.cable = vertex_cable[np.r_[starts, single]]
+        # 칸 수가 선분 수와 비슷하도록 잡아, 케이블이 촘촘해져도 칸마다 든 선분 수가 늘지 않게 한다.
+        extent = float(np.ptp(coords, axis=0).max()) if len(coords) else 0.0
+        self.index = GridIndex(np.hstack([
+            np.minimum(self.start, self.end),
+            np.maximum(self.start, self.end)
+        ]),
+                               cell_size=extent /
+                               max(np.sqrt(len(self.cable)), 1.0),
+                               max_cells=MAX_GRID_CELLS)
+
+    def __len__(self):
+        return len(self.cable)
+
+    # 국소별 (가장 가까운 케이블 번호, 거리 m). max_distance_m 안에 케이블이 없으면 (-1, NaN).
+    # 거리 비교는 국소 기준 평면 좌표(위도 1도 단위)에서 하며, 고리 r까지 본 국소는 아직 보지 않은
+    # 선분까지 적어도 r칸(경도 방향으로 줄어든 폭 기준)만큼 떨어져 있다.
+    def nearest(self, lat, lon, max_distance_m=DEFAULT_SEARCH_RADIUS_M):
+        lat = np.asarray(lat, dtype=float)
+        lon = np.asarray(lon, dtype=float)
+        n = len(lat)
+        cable = np.full(n, -1, dtype=np.int64)
+        distance = np.full(n, np.nan)
+        best = np.full(n, np.inf)
+        best_segment = np.full(n, -1, dtype=np.int64)
+        active = np.flatnonzero(np.isfinite(lat) & np.isfinite(lon))
+        if not len(self) or not len(active): return cable, distance
+
+        grid = self.index
+        rows, cols = grid.shape
+        # 격자 밖의 국소도 격자를 연장한 가상의 칸 번호를 쓴다.
+        cell = np.floor((np.column_stack([lat[active], lon[active]]) -
+                         grid.origin) / grid.cell_size).astype(np.int64)
+        ci = np.zeros(n, dtype=np.int64)
+        cj = np.zeros(n, dtype=np.int64)
+        ci[active], cj[active] = cell[:, 0], cell[:, 1]
+        # 고리 r을 다 본 뒤 남은 선분까지의 최소 거리는 r * ring_width
+        ring_width = grid.cell_size * np.cos(np.radians(lat))
+        max_local = max_distance_m / METERS_PER_DEGREE
+        # 격자 안쪽 칸이 처음 나오는 고리와 마지막으로 나오는 고리
+        first_ring = np.maximum.reduce(
+            [np.zeros(n, dtype=np.int64), -ci, ci - (rows - 1), -cj,
+             cj - (cols - 1)])
+        last_ring = np.maximum.reduce([ci, rows - 1 - ci, cj, cols - 1 - cj])
+        ring = first_ring.copy()
+        active = active[(first_ring[active] - 1) * ring_width[active] <
+                        max_local]
+
+        while len(active):
+            for r in np.unique(ring[active]).tolist():
+                members = active[ring[active] == r]
+                offsets = _ring_offsets(r)
+                block = max(MAX_PAIRS_PER_BLOCK // (4 * len(offsets)), 1)
+                for start in range(0, len(members), block):
+                    self._visit_ring(lat, lon, members[start:start + block],
+                                     ci, cj, offsets, best, best_segment)
+            bound = ring[active] * ring_width[active]
+            done = ((best[active] <= bound) | (bound >= max_local) |
+                    (ring[active] >= last_ring[active]))
+            active = active[~done]
+            ring[active] += 1
+
+        found = np.flatnonzero(best_segment >= 0)
+        segment = best_segment[found]
+        _, t = self._local_distance(lat, lon, found, segment)
+        point = self.start[segment] + t[:, None] * (self.end[segment] -
+                                                    self.start[segment])
+        meters = haversine_vector(np.column_stack([lat[found], lon[found]]),
+                                  point, Unit.METERS)
+        within = meters <= max_distance_m
+        cable[found[within]] = self.cable[segment[within]]
+        distance[found[within]] = meters[within]
+        return cable, distance
+
+    # stations 국소들의 고리 칸에 든 선분을 보고 best/best_segment를 고친다.
+    # 거리가 같으면 번호가 작은 선분을 고른다. 후보 쌍이 MAX_PAIRS_PER_BLOCK을 넘으면 국소를 반씩 나눈다.
+    def _visit_ring(self, lat, lon, stations, ci, cj, offsets, best,
+                    best_segment):
+        grid = self.index
+        rows, cols = grid.shape
+        ii = ci[stations, None] + offsets[:, 0]
+        jj = cj[stations, None] + offsets[:, 1]
+        inside = (ii >= 0) & (ii < rows) & (jj >= 0) & (jj < cols)
+        owner = np.broadcast_to(stations[:, None], ii.shape)[inside]
+        flat = ii[inside] * cols + jj[inside]
+        first = grid.cell_offsets[flat]
+        count = grid.cell_offsets[flat + 1] - first
+        total = int(count.sum())
+        if not total: return
+        if total > MAX_PAIRS_PER_BLOCK and len(stations) > 1:
+            half = len(stations) // 2
+            for part in (stations[:half], stations[half:]):
+                self._visit_ring(lat, lon, part, ci, cj, offsets, best,
+                                 best_segment)
+            return
+        station = np.repeat(owner, count)
+        k = np.arange(total) - np.repeat(np.cumsum(count) - count, count)
+        segment = grid.cell_items[np.repeat(first, count) + k]
+
+        # 후보 쌍은 국소별로 이어져 있으므로 구간별 최솟값으로 국소마다 가장 가까운 선분을 고른다.
+        local, _ = self._local_distance(lat, lon, station, segment)
+        starts = np.flatnonzero(np.r_[True, station[1:] != station[:-1]])
+        nearest = np.minimum.reduceat(local, starts)
+        group_size = np.diff(np.r_[starts, len(station)])
+        tied = local == np.repeat(nearest, group_size)
+        segment = np.minimum.reduceat(
+            np.where(tied, segment, np.iinfo(np.int64).max), starts)
+        station, local = station[starts], nearest
+        better = (local < best[station]) | ((local == best[station]) &
+                                            (segment < best_segment[station]))
+        best[station[better]] = local[better]
+        best_segment[station[better]] = segment[better]
+
+    # 국소 x 선분 쌍(station[k], segment[k])의 국소 기준 평면 거리와 선분 위 최근접점 위치(0~1)
+    def _local_distance(self, lat, lon, station, segment):
+        scale = np.cos(np.radians(lat[station]))
+        start, end = self.start[segment], self.end[segment]
+        a_lat = start[:, 0] - lat[station]
+        a_lon = start[:, 1] - lon[station]
+        ab_lat = (end[:, 0] - lat[station]) - a_lat
+        ab_lon = ((end[:, 1] - lon[station]) - a_lon) * scale
+        a_lon *= scale
+        length2 = ab_lon * ab_lon + ab_lat * ab_lat
+        with np.errstate(invalid='ignore', divide='ignore'):
+            t = np.where(length2 > 0,
+                         -(a_lon * ab_lon + a_lat * ab_lat) / length2, 0.0)
+        t = np.clip(t, 0.0, 1.0)
+        local = np.hypot(a_lon + t * ab_lon, a_lat + t * ab_lat)
+        return local, t
+
+
+# 국소 행(index)별 좌표와 최근접 케이블을 기억해 두고, 좌표가 새로 생기거나 바뀐 국소만 다시 계산한다.
+# 지오코딩 결과가 조금씩 채워지는 동안 다시 그릴 때마다 전체를 다시 계산하지 않기 위한 것으로,
+# 여러 세션이 함께 쓴다. 반환하는 배열은 공유되므로 읽기 전용이다.
+class StationCableDistances:
+
+    def __init__(self, proximity, max_distance_m=DEFAULT_SEARCH_RADIUS_M):
+        self.proximity = proximity
+        self.max_distance_m = max_distance_m
+        self._ids = pd.Index([])
+        self._lat = self._lon = self._distance = np.empty(0)
+        self._cable = np.empty(0, dtype=np.int64)
+        self._lock = threading.Lock()
+
+    def update(self, ids, lat, lon):
+        ids = pd.Index(ids)
+        lat = np.asarray(lat, dtype=float)
+        lon = np.asarray(lon, dtype=float)
+        with self._lock:
+            cable = np.full(len(ids), -1, dtype=np.int64)
+            distance = np.full(len(ids), np.nan)
+            position = self._ids.get_indexer(ids)
+            known = np.flatnonzero(position >= 0)
+            same = known[(self._lat[position[known]] == lat[known])
+                         & (self._lon[position[known]] == lon[known])]
+            cable[same] = self._cable[position[same]]
+            distance[same] = self._distance[position[same]]
+            todo = np.setdiff1d(np.arange(len(ids)), same)
+            if len(todo):
+                cable[todo], distance[todo] = self.proximity.nearest(
+                    lat[todo], lon[todo], self.max_distance_m)
+            for array in (cable, distance):
+                array.setflags(write=False)
+            self._ids, self._lat, self._lon = ids, lat.copy(), lon.copy()
+            self._cable, self._distance = cable, distance
+            return cable, distance
@@ -0,0 +1,107 @@
+# --- 지도 클릭 위치 역지오코딩 ---
+# 클릭한 좌표를 grid_m 미터 격자 칸으로 맞춰(snap) 칸 단위로 주소를 찾는다.
+# 같은 칸은 메모리 LRU -> 디스크(SQLite) 순서로 먼저 찾고, 없을 때만 백엔드에 묻는다.
+# 백엔드가 역지오코딩을 지원하지 않거나 실패하면 가장 가까운 국소 주소나
+# 광케이블 읍면동으로 대신 답한다(오프라인 결과는 저장하지 않는다).
+import math
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from geocoding import RateBudget
+
+METERS_PER_DEGREE = 111195.0
+DEFAULT_GRID_M = 30.0
+DEFAULT_LRU_SIZE = 512
+# 오프라인 답은 이 거리 안의 장소만 쓴다.
+MAX_OFFLINE_DISTANCE_M = 3000.0
+
+
+def snap_cell(lat, lon, grid_m=DEFAULT_GRID_M):
+    step_lat = grid_m / METERS_PER_DEGREE
+    row = math.floor(lat / step_lat)
+    # 경도 간격은 칸 중심 위도에서 grid_m가 되도록 잡는다.
+    step_lon = step_lat / max(math.cos(math.radians((row + 0.5) * step_lat)),
+                              1e-6)
+    col = math.floor(lon / step_lon)
+    center = ((row + 0.5) * step_lat, (col + 0.5) * step_lon)
+    return f"{grid_m:g}:{row}:{col}", center
+
+
+# 이름이 붙은 좌표 목록에서 가장 가까운 곳을 찾는 오프라인 조회표
+class NearestPlaces:
+
+    def __init__(self, lat, lon, labels):
+        lat = np.asarray(lat, dtype=float)
+        lon = np.asarray(lon, dtype=float)
+        labels = np.asarray(labels, dtype=object)
+        valid = np.isfinite(lat) & np.isfinite(lon) & pd.notna(labels)
+        self.lat = lat[valid]
+        self.lon = lon[valid]
+        self.labels = labels[valid]
+
+    def __len__(self):
+        return len(self.labels)
+
+    # (이름, 거리 m). 조회표가 비었으면 None.
+    def nearest(self, lat, lon):
+        if not len(self): return None
+        d_lat = (self.lat - lat) * METERS_PER_DEGREE
+        d_lon = (self.lon - lon) * METERS_PER_DEGREE * math.cos(
+            math.radians(lat))
+        distance = np.hypot(d_lat, d_lon)
+        i = int(np.argmin(distance))
+        return self.labels[i], float(distance[i])
+
+
+class ReverseGeocoder:
+
+    # budget을 넘기면 주소 지오코딩과 같은 요청 한도를 나눠 쓴다.
+    def __init__(self, backend=None, cache=None, grid_m=DEFAULT_GRID_M,
+                 lru_size=DEFAULT_LRU_SIZE, budget=None):
+        self.backend = backend
+        self.cache = cache
+        self.grid_m = grid_m
+        self.lru_size = lru_size
+        self.budget = budget or RateBudget(
+            getattr(backend, 'rate_per_second', None))
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _remember(self, cell, address):
+        with self._lock:
+            self._lru[cell] = address
+            self._lru.move_to_end(cell)
+            while len(self._lru) > self.lru_size:
+                self._lru.popitem(last=False)
+
+    # (주소, 출처) 출처는 '메모리 캐시' | '디스크 캐시' | 백엔드 이름 | '오프라인' | None
+    def reverse(self, lat, lon, fallback=None):
+        cell, (cell_lat, cell_lon) = snap_cell(lat, lon, self.grid_m)
+        with self._lock:
+            if cell in self._lru:
+                self._lru.move_to_end(cell)
+                return self._lru[cell], '메모리 캐시'
+        address = self.cache.get(cell) if self.cache else None
+        if address is not None:
+            self._remember(cell, address)
+            return address, '디스크 캐시'
+
+        if hasattr(self.backend, 'reverse'):
+            try:
+                self.budget.acquire()
+                address = self.backend.reverse(cell_lat, cell_lon)
+            except Exception:
+                address = None
+            if address:
+                self._remember(cell, address)
+                if self.cache: self.cache.put(cell, address)
+                return address, self.backend.name
+
+        nearest = fallback.nearest(lat, lon) if fallback is not None else None
+        if nearest and nearest[1] <= MAX_OFFLINE_DISTANCE_M:
+            label, distance = nearest
+            return f"{label} 부근 (약 {distance:,.0f}m)", '오프라인'
+        return None, None
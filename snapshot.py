@@ -0,0 +1,222 @@
+# --- 엑셀 입력 파일의 컬럼형 스냅샷 캐시 ---
+# 파싱/가공이 끝난 데이터프레임을 Arrow IPC 파일로 저장해 두고,
+# 원본 파일의 지문(경로, 수정 시각, 크기, 내용 해시)이 바뀌었을 때만 엑셀을 다시 읽는다.
+# 스냅샷은 압축 없이 저장하고 메모리 맵으로 열어 읽기 비용을 줄인다.
+# 케이블 좌표(RaggedCoords)는 리스트 컬럼 하나로 함께 저장하고, 읽을 때는 파이썬 객체로
+# 풀지 않고 메모리 맵 버퍼를 그대로 가리키는 배열로 돌려준다.
+import glob
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from geometry import RaggedCoords
+
+SNAPSHOT_DIR = os.path.join(".cache", "snapshots")
+GEOMETRY_COLUMN = '__geometry__'
+ROW_HASH_COLUMN = '__row_hash__'
+
+
+def _path_key(path):
+    return hashlib.sha1(os.path.abspath(path).encode('utf-8')).hexdigest()[:12]
+
+
+def _content_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# 수정 시각과 크기가 지난번과 같으면 저장해 둔 내용 해시를 재사용하고,
+# 달라졌을 때만 파일 전체를 다시 해시한다.
+def file_fingerprint(path, snapshot_dir=SNAPSHOT_DIR):
+    stat = os.stat(path)
+    record_path = os.path.join(snapshot_dir,
+                               f"{_path_key(path)}.fingerprint.json")
+    try:
+        with open(record_path, encoding='utf-8') as f:
+            record = json.load(f)
+        if (record['mtime_ns'], record['size']) == (stat.st_mtime_ns,
+                                                    stat.st_size):
+            return record
+    except (OSError, ValueError, KeyError):
+        pass
+
+    record = {
+        'path': os.path.abspath(path),
+        'mtime_ns': stat.st_mtime_ns,
+        'size': stat.st_size,
+        'sha256': _content_hash(path),
+    }
+    try:
+        os.makedirs(snapshot_dir, exist_ok=True)
+        with open(record_path, 'w', encoding='utf-8') as f:
+            json.dump(record, f)
+    except OSError:
+        pass
+    return record
+
+
+# 타입이 섞인 object 컬럼(예: 숫자와 문자열이 섞인 코드 컬럼)은 Arrow로 옮길 수 없으므로
+# 값이 있는 칸만 문자열로 바꾼다.
+def _to_arrow_table(df):
+    try:
+        return pa.Table.from_pandas(df, preserve_index=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        pass
+    df = df.copy()
+    for col in df.columns:
+        if df[col].dtype != object: continue
+        try:
+            pa.array(df[col], from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            df[col] = df[col].map(lambda v: v if v is None or v != v else str(v))
+    return pa.Table.from_pandas(df, preserve_index=True)
+
+
+# 좌표가 함께 저장된 스냅샷은 (df, RaggedCoords)를 반환한다.
+def read_snapshot(snapshot_path):
+    with pa.memory_map(snapshot_path, 'r') as source:
+        table = pa.ipc.open_file(source).read_all()
+    if GEOMETRY_COLUMN not in table.column_names:
+        return table.to_pandas()
+    geometry = RaggedCoords.from_arrow(table.column(GEOMETRY_COLUMN))
+    return table.drop_columns([GEOMETRY_COLUMN]).to_pandas(), geometry
+
+
+def write_snapshot(df, snapshot_path, geometry=None):
+    table = _to_arrow_table(df)
+    if geometry is not None:
+        table = table.append_column(GEOMETRY_COLUMN, geometry.to_arrow())
+    tmp_path = f"{snapshot_path}.{os.getpid()}.tmp"
+    with pa.OSFile(tmp_path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, snapshot_path)
+
+
+# name별 스냅샷을 불러오거나, 없으면 build()로 만든 뒤 저장한다.
+# version은 로더의 가공 로직이 바뀔 때 올려서 예전 스냅샷을 무효화하는 데 쓴다.
+# build()는 df 또는 (df, RaggedCoords)를 반환하며, None이면(읽기 실패 등) 스냅샷을 남기지 않는다.
+# 반환하는 df.attrs['data_version']에는 스냅샷 키를 남겨, 이 데이터로 만든 파생 결과
+# (지도 레이어, 인덱스 등)를 캐시할 때 키로 쓴다.
+#
+# parse를 넘기면 build()는 가공 전 원본 df를 반환하고, 행 단위 가공은 parse(df)가 맡는다.
+# 이때는 원본 행 해시를 이전 스냅샷과 비교해 추가/변경된 행만 parse하고 나머지 행은
+# 이전 가공 결과를 그대로 쓴다. key 컬럼 기준 추가/변경/삭제 개수는
+# df.attrs['snapshot_diff']에 남는다(스냅샷을 새로 만든 경우에만).
+def load_with_snapshot(path, name, build, version='1',
+                       snapshot_dir=SNAPSHOT_DIR, parse=None, key=None):
+    fingerprint = file_fingerprint(path, snapshot_dir)
+    prefix = f"{name}-{_path_key(path)}-"
+    version_key = f"v{version}-{fingerprint['sha256'][:16]}"
+    data_version = f"{name}-{version_key}"
+    snapshot_path = os.path.join(snapshot_dir, f"{prefix}{version_key}.arrow")
+    if os.path.exists(snapshot_path):
+        try:
+            return _with_version(read_snapshot(snapshot_path), data_version)
+        except (OSError, pa.ArrowInvalid):
+            pass
+
+    result = build()
+    if result is None: return None
+    diff = None
+    if parse is not None:
+        previous = _previous_snapshot(snapshot_dir, f"{prefix}v{version}-",
+                                      snapshot_path)
+        result, diff = _parse_changed_rows(result, parse, previous, key)
+        if result is None: return None
+    df, geometry = result if isinstance(result, tuple) else (result, None)
+    try:
+        os.makedirs(snapshot_dir, exist_ok=True)
+        write_snapshot(df, snapshot_path, geometry)
+    except (OSError, pa.ArrowInvalid, pa.ArrowTypeError,
+            pa.ArrowNotImplementedError):
+        return _with_version(result, data_version, diff)
+    for stale in glob.glob(os.path.join(snapshot_dir, f"{prefix}*.arrow")):
+        if stale != snapshot_path:
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+    # 처음 만든 경우에도 스냅샷에서 읽은 것과 같은 형태로 돌려준다.
+    return _with_version(read_snapshot(snapshot_path), data_version, diff)
+
+
+def _with_version(result, data_version, diff=None):
+    if isinstance(result, tuple):
+        df, geometry = result
+    else:
+        df, geometry = result, None
+    if ROW_HASH_COLUMN in df.columns:
+        df = df.drop(columns=[ROW_HASH_COLUMN])
+    df.attrs['data_version'] = data_version
+    if diff is not None:
+        df.attrs['snapshot_diff'] = diff
+    return df if geometry is None else (df, geometry)
+
+
+# 같은 파일, 같은 가공 버전으로 만든 이전 스냅샷 중 가장 최근 것 (행 해시가 있는 경우만)
+def _previous_snapshot(snapshot_dir, prefix, current_path):
+    candidates = [
+        p for p in glob.glob(os.path.join(snapshot_dir, f"{prefix}*.arrow"))
+        if p != current_path
+    ]
+    for snapshot_path in sorted(candidates, key=os.path.getmtime,
+                                reverse=True):
+        try:
+            previous = read_snapshot(snapshot_path)
+        except (OSError, pa.ArrowInvalid):
+            continue
+        if isinstance(previous, pd.DataFrame) and (ROW_HASH_COLUMN
+                                                   in previous.columns):
+            return previous
+    return None
+
+
+def _row_keys(df, key):
+    return list(zip(*(df[column].astype(object).map(str) for column in key)))
+
+
+def _parse_changed_rows(raw, parse, previous, key):
+    raw = raw.reset_index(drop=True)
+    hashes = pd.util.hash_pandas_object(raw.astype(str),
+                                        index=False).to_numpy()
+    raw = raw.assign(**{ROW_HASH_COLUMN: hashes})
+
+    # 원본 행 해시가 이전 스냅샷에 있으면 그 행의 가공 결과를 그대로 쓴다.
+    # (이전 가공에서 걸러진 행은 해시가 남아 있지 않으므로 다시 parse된다.)
+    reuse = np.zeros(len(raw), dtype=bool)
+    reused = None
+    if previous is not None and len(previous):
+        previous = previous.drop_duplicates(ROW_HASH_COLUMN)
+        previous_hashes = previous[ROW_HASH_COLUMN].to_numpy(dtype=np.uint64)
+        reuse = np.isin(hashes, previous_hashes)
+        if reuse.any():
+            position = pd.Series(np.arange(len(previous)),
+                                 index=previous_hashes)
+            reused = previous.iloc[position.loc[hashes[reuse]].to_numpy()]
+            reused.index = np.flatnonzero(reuse)
+
+    parsed = parse(raw[~reuse]) if (~reuse).any() else None
+    if parsed is None and (~reuse).any(): return None, None
+    parts = [part for part in (reused, parsed) if part is not None]
+    df = pd.concat(parts).sort_index() if parts else raw.iloc[:0]
+
+    diff = {'rows': len(raw), 'reparsed': int((~reuse).sum())}
+    key = [key] if isinstance(key, str) else list(key or [])
+    if previous is not None and key and all(
+            column in raw.columns and column in previous.columns
+            for column in key):
+        old = dict(zip(_row_keys(previous, key), previous[ROW_HASH_COLUMN]))
+        new = dict(zip(_row_keys(raw, key), hashes))
+        diff.update(added=len(new.keys() - old.keys()),
+                    removed=len(old.keys() - new.keys()),
+                    changed=int(sum(old[k] != new[k]
+                                    for k in new.keys() & old.keys())))
+    return df, diff
@@ -0,0 +1,117 @@
+# --- 공간 인덱스 (균일 격자) ---
+# 케이블 경계 상자나 국소 좌표(점)를 균일한 격자 칸에 나눠 담아 두고,
+# 화면 범위(+여유)와 겹치는 항목만 빠르게 골라낸다.
+# 칸별 항목 목록은 (칸 번호 순으로 정렬된 항목 배열, 칸별 시작 위치) CSR 형태로 저장한다.
+# 경계 상자는 모두 (min_lat, min_lon, max_lat, max_lon) 순서다.
+import math
+
+import numpy as np
+
+MAX_GRID_CELLS = 256
+
+
+class GridIndex:
+
+    def __init__(self, bounds, cell_size=None, max_cells=MAX_GRID_CELLS):
+        bounds = np.asarray(bounds, dtype=float).reshape(-1, 4)
+        self.bounds = bounds
+        valid = np.flatnonzero(np.isfinite(bounds).all(axis=1))
+        if len(valid) == 0:
+            self.origin = np.zeros(2)
+            self.cell_size = 1.0
+            self.shape = (1, 1)
+            self.cell_items = np.empty(0, dtype=np.int64)
+            self.cell_offsets = np.zeros(2, dtype=np.int64)
+            return
+
+        lo = bounds[valid, :2].min(axis=0)
+        hi = bounds[valid, 2:].max(axis=0)
+        extent = max(float((hi - lo).max()), 1e-9)
+        if cell_size is None:
+            # 항목 크기의 중앙값 정도, 그리고 칸 수가 항목 수와 비슷해지도록 잡는다.
+            spans = (bounds[valid, 2:] - bounds[valid, :2]).max(axis=1)
+            cell_size = max(float(np.median(spans)),
+                            extent / max(np.sqrt(len(valid)), 1.0))
+        cell_size = max(cell_size, extent / max_cells)
+        self.origin = lo
+        self.cell_size = cell_size
+        rows, cols = (np.floor((hi - lo) / cell_size).astype(int) + 1)
+        self.shape = (int(rows), int(cols))
+
+        i0, j0 = self._cell(bounds[valid, :2]).T
+        i1, j1 = self._cell(bounds[valid, 2:]).T
+        ni, nj = i1 - i0 + 1, j1 - j0 + 1
+        per_item = ni * nj
+        item = np.repeat(valid, per_item)
+        start = np.zeros(len(valid), dtype=np.int64)
+        np.cumsum(per_item[:-1], out=start[1:])
+        k = np.arange(per_item.sum()) - np.repeat(start, per_item)
+        nj_rep = np.repeat(nj, per_item)
+        cell = ((np.repeat(i0, per_item) + k // nj_rep) * self.shape[1] +
+                np.repeat(j0, per_item) + k % nj_rep)
+
+        order = np.argsort(cell, kind='stable')
+        self.cell_items = item[order]
+        self.cell_offsets = np.zeros(rows * cols + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cell, minlength=rows * cols),
+                  out=self.cell_offsets[1:])
+
+    @classmethod
+    def from_points(cls, lat, lon, cell_size=None):
+        lat = np.asarray(lat, dtype=float)
+        lon = np.asarray(lon, dtype=float)
+        return cls(np.column_stack([lat, lon, lat, lon]), cell_size)
+
+    def __len__(self):
+        return len(self.bounds)
+
+    def _cell(self, latlon):
+        cell = np.floor((latlon - self.origin) / self.cell_size).astype(int)
+        return np.clip(cell, 0, np.array(self.shape) - 1)
+
+    # bbox와 겹치는 항목 번호(오름차순). bbox가 None이면 좌표가 있는 모든 항목.
+    def query(self, bbox):
+        if bbox is None:
+            return np.flatnonzero(np.isfinite(self.bounds).all(axis=1))
+        min_lat, min_lon, max_lat, max_lon = bbox
+        (i0, j0), (i1, j1) = self._cell(np.array([[min_lat, min_lon],
+                                                  [max_lat, max_lon]]))
+        row_starts = np.arange(i0, i1 + 1) * self.shape[1]
+        slices = [
+            self.cell_items[self.cell_offsets[r + j0]:self.cell_offsets[r + j1 +
+                                                                        1]]
+            for r in row_starts
+        ]
+        if not slices: return np.empty(0, dtype=np.int64)
+        candidates = np.unique(np.concatenate(slices))
+        b = self.bounds[candidates]
+        hit = ((b[:, 0] <= max_lat) & (b[:, 2] >= min_lat) &
+               (b[:, 1] <= max_lon) & (b[:, 3] >= min_lon))
+        return candidates[hit]
+
+    def mask(self, bbox):
+        visible = np.zeros(len(self.bounds), dtype=bool)
+        visible[self.query(bbox)] = True
+        return visible
+
+
+# 지도 화면 범위(bounds)에 가로세로로 margin 비율만큼 여유를 더한 범위
+def expand_bbox(bbox, margin=0.5):
+    min_lat, min_lon, max_lat, max_lon = bbox
+    d_lat = (max_lat - min_lat) * margin
+    d_lon = (max_lon - min_lon) * margin
+    return (min_lat - d_lat, min_lon - d_lon, max_lat + d_lat, max_lon + d_lon)
+
+
+def bbox_contains(outer, inner):
+    return (outer[0] <= inner[0] and outer[1] <= inner[1]
+            and outer[2] >= inner[2] and outer[3] >= inner[3])
+
+
+# 중심과 줌, 지도 크기(픽셀)로 화면 범위를 어림한다. (웹 메르카토르, 타일 256px)
+def estimate_view_bbox(center, zoom, width_px, height_px):
+    lat, lon = center
+    deg_per_px = 360.0 / (256 * 2**zoom)
+    half_lon = width_px / 2 * deg_per_px
+    half_lat = height_px / 2 * deg_per_px * math.cos(math.radians(lat))
+    return (lat - half_lat, lon - half_lon, lat + half_lat, lon + half_lon)
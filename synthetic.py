@@ -0,0 +1,265 @@
+# --- 합성 입력 데이터 생성 ---
+# 대시보드 로더가 읽는 세 엑셀 파일(광케이블가평.xlsx, 복구미복구국소.xlsx, 진행현황.xlsx)을
+# 실제 파일과 같은 시트/컬럼 구성으로 원하는 규모(케이블/국소 1천 ~ 1백만 행)만큼 만든다.
+# 케이블은 읍면동 중심 주변에서 출발하는 랜덤 워크 선(WKT), 국소는 대부분 케이블 근처에
+# 놓고 좌표를 DMS 문자열('N 037:48:01.512')로 적는다. 일부 국소는 좌표 없이 주소만 남겨
+# 지오코딩 경로도 함께 거치게 한다. 같은 seed면 같은 파일이 나온다.
+# 큰 파일도 메모리에 다 올리지 않도록 openpyxl 쓰기 전용 모드로 조각씩 써 내려간다.
+import argparse
+import math
+import os
+
+import numpy as np
+from openpyxl import Workbook
+
+from layers import EMD_COLUMN
+from loaders import CABLE_FILE, PROGRESS_FILE, RECOVERY_FILE
+
+# 시트 하나에 담을 수 있는 데이터 행 수 (헤더 제외)
+MAX_SHEET_ROWS = 1_048_575
+CHUNK_ROWS = 10_000
+METERS_PER_DEGREE = 111195.0
+
+# 읍면동별 대략적인 중심 (위도, 경도)
+EMD_CENTERS = {
+    '가평읍': (37.831, 127.510),
+    '설악면': (37.676, 127.493),
+    '청평면': (37.736, 127.423),
+    '상면': (37.775, 127.360),
+    '조종면': (37.833, 127.345),
+    '북면': (37.925, 127.500),
+}
+VILLAGES = ['대보', '마일', '현리', '신상', '운악', '연하', '율길', '봉수', '항사', '승안',
+            '경반', '도대', '화악', '소법', '청평', '상천', '위곡', '가일', '신천', '묵안']
+WORKERS = ['박성민', '정종구', '이병준', '김가람', '최우진', '한지수', '오세영', '윤태호']
+
+CABLE_COLUMNS = ['관리번호', EMD_COLUMN, '공간위치G']
+RECOVERY_COLUMNS = [
+    'No', '파트', 'RU / 중계기=>중계기 종류', '공용대표코드', '시설코드', 'Address', '장비유형',
+    '피해원인', '복구상태', '발생시각', '복구시각', '지역', '제공사', '공동망구분', '영향이용자수',
+    '시설물(양호/불량)', '점검내역(정전/선로불량/유니트)', '특이사항', '유형', '추가대응', '대응조',
+    '장비식수 기준\n90개미복구대상', 'ABD 122 Site/미복구 42Site', '복구유무', '국소별\n우선순위',
+    '우선순위\n(1,2,3순위)', '복구예정\n일자', '서비스 현황', 'VoC\n(복구전)', 'VoC\n(복구후)',
+    '경도', '위도', '국소명', '주소'
+]
+PROGRESS_COLUMNS = [
+    '진행여부', '구분', '담당자', '작업내역', '이슈사항', '작업일', '위경도', '주소', '중계기 식수'
+]
+REPEATER_COLUMNS = ['국소명', '복구 담당자', '복구/미복구', '기타']
+
+UNRECOVERED_RATE = 0.13
+INSPECTIONS = ['케이블 단선', '케이블 단선/종말주 유실', '정전', '유니트 불량']
+EQUIPMENT = ['LRU', 'LRRU', 'WRCS', 'SLRRU', 'LRRUM']
+PROGRESS_STATES = ['작업완료', '진행중', '현장확인']
+PROGRESS_KINDS = ['선로작업완료', '선로 포설작업', 'RM복구작업', '이동기지국']
+
+
+# 케이블별 구간 안에서만 누적합을 구한다.
+def _grouped_cumsum(values, lengths):
+    first = np.cumsum(lengths) - lengths
+    total = np.cumsum(values)
+    return total - np.repeat(total[first] - values[first], lengths)
+
+
+# 케이블마다 읍면동 중심 근처에서 출발해 방향을 조금씩 틀며 60~150m씩 나아간다.
+# 반환값: 읍면동 이름 배열, 케이블별 점 개수, (점 개수 합, 2) [위도, 경도] 배열
+def _cable_walks(rng, n, min_points=8, max_points=40):
+    names = np.array(list(EMD_CENTERS))
+    centers = np.array(list(EMD_CENTERS.values()))
+    emd = rng.integers(len(names), size=n)
+    lengths = rng.integers(min_points, max_points + 1, size=n)
+    first = np.cumsum(lengths) - lengths
+
+    turn = rng.normal(0, 0.35, size=lengths.sum())
+    turn[first] = rng.uniform(0, 2 * math.pi, n)
+    heading = _grouped_cumsum(turn, lengths)
+    step = rng.uniform(60, 150, size=len(heading))
+    step[first] = 0
+    origin = centers[emd] + rng.normal(0, 0.035, size=(n, 2))
+    lat0 = np.repeat(origin[:, 0], lengths)
+    d_lat = step * np.sin(heading) / METERS_PER_DEGREE
+    d_lon = step * np.cos(heading) / (METERS_PER_DEGREE *
+                                      np.cos(np.radians(lat0)))
+    coords = np.column_stack([
+        lat0 + _grouped_cumsum(d_lat, lengths),
+        np.repeat(origin[:, 1], lengths) + _grouped_cumsum(d_lon, lengths)
+    ])
+    return names[emd], lengths, coords
+
+
+def _wkt(coords):
+    points = ", ".join(f"{lon:.7f} {lat:.7f}" for lat, lon in coords.tolist())
+    return f"LINESTRING({points})"
+
+
+def _dms(value, hemisphere):
+    degrees = int(value)
+    minutes = int((value - degrees) * 60)
+    seconds = (value - degrees - minutes / 60) * 3600
+    return f"{hemisphere} {degrees:03d}:{minutes:02d}:{seconds:06.3f}"
+
+
+def _check_rows(name, n):
+    if n > MAX_SHEET_ROWS:
+        raise ValueError(f"{name}: 엑셀 시트에는 최대 {MAX_SHEET_ROWS:,}행까지 담을 수 있습니다 "
+                         f"(요청 {n:,}행)")
+
+
+def write_cables(path, n, rng):
+    _check_rows(CABLE_FILE, n)
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Sheet1')
+    sheet.append(CABLE_COLUMNS)
+    # 국소 배치에 쓰도록 케이블 점을 일부 표본으로 남긴다.
+    samples = []
+    for start in range(0, n, CHUNK_ROWS):
+        emds, lengths, coords = _cable_walks(rng, min(CHUNK_ROWS, n - start))
+        offsets = np.concatenate([[0], np.cumsum(lengths)])
+        for i, emd in enumerate(emds):
+            sheet.append([
+                start + i, emd,
+                _wkt(coords[offsets[i]:offsets[i + 1]])
+            ])
+        pick = rng.integers(len(coords), size=min(len(coords), 2000))
+        samples.append(coords[pick])
+    workbook.save(path)
+    return np.vstack(samples) if samples else np.empty((0, 2))
+
+
+# 대부분은 케이블 점에서 200m 안팎으로, 나머지는 읍면동 중심 주변에 흩어 놓는다.
+def _station_coords(rng, n, cable_points):
+    names = np.array(list(EMD_CENTERS))
+    centers = np.array(list(EMD_CENTERS.values()))
+    emd = rng.integers(len(names), size=n)
+    coords = centers[emd] + rng.normal(0, 0.04, size=(n, 2))
+    near = rng.random(n) < 0.9 if len(cable_points) else np.zeros(n, bool)
+    if near.any():
+        coords[near] = cable_points[rng.integers(
+            len(cable_points), size=near.sum())] + rng.normal(
+                0, 200 / METERS_PER_DEGREE, size=(near.sum(), 2))
+        # 케이블 근처 국소의 읍면동은 가장 가까운 중심으로 정한다.
+        distance = ((coords[near, None, :] - centers[None, :, :])**2).sum(-1)
+        emd[near] = distance.argmin(axis=1)
+    return names[emd], coords
+
+
+def write_recovery(path, n, rng, cable_points, address_only=0.02):
+    _check_rows(RECOVERY_FILE, n)
+    emds, coords = _station_coords(rng, n, cable_points)
+    unrecovered = rng.random(n) < UNRECOVERED_RATE
+    no_coords = rng.random(n) < address_only
+    inspection = rng.integers(len(INSPECTIONS) + 1, size=n)
+    shared = rng.random(n) < 0.02
+    village = rng.integers(len(VILLAGES), size=n)
+    lot = rng.integers(1, 900, size=n)
+    equipment = rng.integers(len(EQUIPMENT), size=n)
+    users = rng.integers(1, 30, size=n)
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Sheet1')
+    sheet.append(RECOVERY_COLUMNS)
+    names = []
+    for i in range(n):
+        code = f"SYN{i:07d}"
+        name = f"(공동K){VILLAGES[village[i]]}리{lot[i]}{EQUIPMENT[equipment[i]]}"
+        status = '미복구' if unrecovered[i] else '복구'
+        row = dict.fromkeys(RECOVERY_COLUMNS)
+        row.update({
+            'No': i + 1,
+            '파트': '남양주품질개선팀',
+            'RU / 중계기=>중계기 종류': name,
+            '공용대표코드': code,
+            '시설코드': code,
+            'Address': f"0-0-{code}",
+            '장비유형': EQUIPMENT[equipment[i]],
+            '복구상태': status,
+            '발생시각': '2025-07-20 14:00:00',
+            '복구시각': None if unrecovered[i] else '2025-07-21 09:00:00',
+            '지역': f"경기 가평군 {emds[i]}",
+            '제공사': 'SKT',
+            '공동망구분': '공동' if shared[i] else '단독',
+            '영향이용자수': int(users[i]),
+            '시설물(양호/불량)': status,
+            '복구유무': status,
+            '국소명': name,
+            '주소': f"경기 가평군 {emds[i]} {VILLAGES[village[i]]}리 {lot[i]}-{i % 97 + 1}",
+        })
+        if unrecovered[i] and inspection[i] < len(INSPECTIONS):
+            row['점검내역(정전/선로불량/유니트)'] = INSPECTIONS[inspection[i]]
+        if not no_coords[i]:
+            # 실제 파일처럼 '경도' 컬럼에 위도, '위도' 컬럼에 경도가 들어 있다.
+            row['경도'] = _dms(coords[i, 0], 'N')
+            row['위도'] = _dms(coords[i, 1], 'N')
+        sheet.append(list(row.values()))
+        names.append(name)
+    workbook.save(path)
+    return names, coords
+
+
+def write_progress(path, n, rng, station_names, station_coords):
+    _check_rows(PROGRESS_FILE, n)
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Sheet1')
+    sheet.append(PROGRESS_COLUMNS)
+    pick = rng.integers(max(len(station_names), 1), size=n)
+    for i in range(n):
+        lat, lon = (station_coords[pick[i]] + rng.normal(0, 0.001, 2)
+                    if len(station_names) else EMD_CENTERS['가평읍'])
+        emd = list(EMD_CENTERS)[i % len(EMD_CENTERS)]
+        sheet.append([
+            PROGRESS_STATES[rng.integers(len(PROGRESS_STATES))],
+            PROGRESS_KINDS[rng.integers(len(PROGRESS_KINDS))],
+            ",".join(rng.choice(WORKERS, 2, replace=False)),
+            f"{VILLAGES[i % len(VILLAGES)]}{i}R1~중계기 사이 복구작업",
+            station_names[pick[i]] if len(station_names) else None,
+            f"7월{20 + i % 10}일",
+            f"{lat:.6f}, {lon:.6f}",
+            f"경기도 가평군 {emd} {VILLAGES[i % len(VILLAGES)]}리 {i + 1}",
+            float(rng.integers(1, 6)),
+        ])
+    repeaters = workbook.create_sheet('Sheet2')
+    repeaters.append(REPEATER_COLUMNS)
+    for i in range(min(2 * n, MAX_SHEET_ROWS)):
+        repeaters.append([
+            station_names[pick[i % n]] if len(station_names) else f"중계기{i}",
+            WORKERS[i % len(WORKERS)],
+            '미복구' if rng.random() < UNRECOVERED_RATE else '복구', None
+        ])
+    workbook.save(path)
+
+
+# out_dir에 세 입력 파일을 만든다. progress를 주지 않으면 국소 40개당 진행 현황 1건.
+def generate(out_dir, cables=1000, stations=1000, progress=None, seed=0,
+             address_only=0.02):
+    os.makedirs(out_dir, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    progress = max(stations // 40, 10) if progress is None else progress
+    paths = {
+        name: os.path.join(out_dir, name)
+        for name in (CABLE_FILE, RECOVERY_FILE, PROGRESS_FILE)
+    }
+    cable_points = write_cables(paths[CABLE_FILE], cables, rng)
+    names, coords = write_recovery(paths[RECOVERY_FILE], stations, rng,
+                                   cable_points, address_only)
+    write_progress(paths[PROGRESS_FILE], progress, rng, names, coords)
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="대시보드 입력 엑셀 합성 데이터 생성")
+    parser.add_argument('out_dir')
+    parser.add_argument('--cables', type=int, default=1000)
+    parser.add_argument('--stations', type=int, default=1000)
+    parser.add_argument('--progress', type=int)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--address-only', type=float, default=0.02,
+                        help="좌표 없이 주소만 있는 국소 비율")
+    args = parser.parse_args(argv)
+    for name, path in generate(args.out_dir, args.cables, args.stations,
+                               args.progress, args.seed,
+                               args.address_only).items():
+        print(f"{name}: {os.path.getsize(path) / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+# --- parse_dms/parse_latlon과 원래 행 단위 변환 함수 비교 ---
+import math
+import random
+import re
+
+import numpy as np
+import pandas as pd
+
+from coords import parse_dms, parse_latlon
+
+
+# 일괄 변환 이전 read_recovery_status_data의 행 단위 DMS 변환
+def parse_dms_to_dd_old(dms_str):
+    if not isinstance(dms_str, str): return None
+    try:
+        parts = re.match(r'([NSEW])\s*(\d+):(\d+):([\d\.]+)', dms_str.strip())
+        if not parts: return None
+        direction, degrees, minutes, seconds = parts.groups()
+        degrees, minutes, seconds = float(degrees), float(minutes), float(
+            seconds)
+        dd = degrees + (minutes / 60.0) + (seconds / 3600.0)
+        if direction in ('S', 'W'): dd *= -1
+        return dd
+    except (ValueError, TypeError):
+        return None
+
+
+# 일괄 변환 이전 진행 현황 지도의 행 단위 '위도, 경도' 변환
+def parse_latlon_string_old(text):
+    if not isinstance(text, str): return None
+    try:
+        lat, lon = map(float, text.split(','))
+        return [lat, lon]
+    except (ValueError, IndexError):
+        return None
+
+
+def assert_dms_same_as_old(values):
+    dd, valid = parse_dms(pd.Series(values, dtype=object))
+    for value, got, ok in zip(values, dd, valid):
+        expected = parse_dms_to_dd_old(value)
+        assert ok == (expected is not None), value
+        if ok: assert got == expected, value
+
+
+# 예전 함수는 'nan', 'inf'도 숫자로 받았지만 지도에 올릴 수 없으므로 새 함수는 무효로 본다.
+def assert_latlon_same_as_old(values):
+    lat, lon, valid = parse_latlon(pd.Series(values, dtype=object))
+    for value, got_lat, got_lon, ok in zip(values, lat, lon, valid):
+        expected = parse_latlon_string_old(value)
+        usable = expected is not None and all(map(math.isfinite, expected))
+        assert ok == usable, value
+        if ok: assert [got_lat, got_lon] == expected, value
+
+
+DMS_CASES = [
+    'N 037:45:05.609', 'E 127:30:15.5', 'S 037:45:05.609', 'W 127:30:15',
+    'N037:45:05.609', '  N 037:45:05.609  ', 'N 37:45:5', 'N 037:45:05.609 추가',
+    'N 037:45:05.6.1', 'N 037:45:.5', 'N 037:45', 'N 037-45-05.609',
+    'n 037:45:05.609', 'X 037:45:05.609', '037:45:05.609', '북 037:45:05.609',
+    '', ' ', None, float('nan'), 37.75, 127, pd.NaT
+]
+
+LATLON_CASES = [
+    '37.846515, 127.345851', '37.846515,127.345851', ' 37.8 , 127.3 ',
+    '-37.8, -127.3', '+37.8, +127.3', '37, 127', '.5, .25', '3.7e1, 1.27e2',
+    '37.8', '37.8, 127.3, 10', '37.8; 127.3', '37.8 127.3', '37.8,',
+    ',127.3', 'abc, def', '37.8.1, 127.3', 'nan, nan', 'inf, 127.3', '', ' ',
+    None, float('nan'), 37.8
+]
+
+
+def test_dms_edge_cases():
+    assert_dms_same_as_old(DMS_CASES)
+
+
+def test_latlon_edge_cases():
+    assert_latlon_same_as_old(LATLON_CASES)
+
+
+# 복구 국소 시트는 '경도' 컬럼에 위도가, '위도' 컬럼에 경도가 들어 있다.
+# 컬럼이 바뀐 채로 넘겨도 행마다 같은 값을 내야 한다.
+def test_swapped_dms_columns():
+    df = pd.DataFrame({
+        '경도': ['N 037:45:05.609', 'N 037:50:00', None, 'bad'],
+        '위도': ['E 127:30:15.5', 'E 127:20:00', 'E 127:00:00', None],
+    })
+    for column in ('경도', '위도'):
+        assert_dms_same_as_old(df[column].tolist())
+    lat, _ = parse_dms(df['경도'])
+    lon, _ = parse_dms(df['위도'])
+    assert 37 < np.nanmin(lat) and np.nanmax(lat) < 38
+    assert 127 <= np.nanmin(lon) and np.nanmax(lon) < 128
+
+
+def test_all_missing_and_non_string_columns():
+    dd, valid = parse_dms(pd.Series([None, None]))
+    assert np.isnan(dd).all() and not valid.any()
+    dd, valid = parse_dms(pd.Series([1.5, 2.5]))
+    assert np.isnan(dd).all() and not valid.any()
+    lat, lon, valid = parse_latlon(pd.Series([], dtype=object))
+    assert len(lat) == len(lon) == len(valid) == 0
+
+
+# 알려진 차이: 예전 함수는 float()과 re의 \d를 따라 유니코드 숫자와 밑줄 숫자('1_000')도
+# 받았지만, 새 함수는 ASCII 숫자만 좌표로 본다.
+def test_unicode_and_underscore_digits_are_rejected():
+    assert parse_dms_to_dd_old('N ٣٧:45:05') is not None
+    assert parse_latlon_string_old('3_7.8, 127.3') is not None
+    assert parse_latlon_string_old('３７.8, 127.3') is not None
+    _, valid = parse_dms(pd.Series(['N ٣٧:45:05', 'N ３７:45:05']))
+    assert not valid.any()
+    _, _, valid = parse_latlon(pd.Series(['3_7.8, 127.3', '３７.8, 127.3']))
+    assert not valid.any()
+
+
+def _fuzzed_dms(rng):
+    parts = [
+        rng.choice(['N', 'S', 'E', 'W', 'n', '', 'X']),
+        rng.choice(['', ' ', '  ', '\t']),
+        rng.choice(['037', '127', '37', '', 'a']),
+        rng.choice([':', '-', '']),
+        rng.choice(['45', '5', '', '4.5']),
+        rng.choice([':', '']),
+        rng.choice(['05.609', '5', '.5', '05.6.1', '', '5.']),
+        rng.choice(['', ' ', 'x', ' 추가']),
+    ]
+    return ''.join(parts)
+
+
+def test_fuzzed_values():
+    rng = random.Random(0)
+    latlon_pieces = ['37', '.', '8', '127', ',', ', ', ' ', '-', '+', 'e',
+                     '1', 'x', ';', '0']
+    assert_dms_same_as_old([_fuzzed_dms(rng) for _ in range(3000)])
+    assert_latlon_same_as_old([
+        ''.join(rng.choice(latlon_pieces) for _ in range(rng.randint(0, 12)))
+        for _ in range(3000)
+    ])
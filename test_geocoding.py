@@ -0,0 +1,39 @@
+# --- 지오코딩 파이프라인/작업: 중복 제거, 캐시, 실패 재시도 ---
+import geocoding
+from geocache import GeocodeCache
+from geocoding import FakeBackend, GeocodingJob, GeocodingPipeline
+
+ADDRESSES = [f"경기 가평군 가평읍 읍내리 {i}" for i in range(200)]
+
+
+def test_job_looks_up_each_address_once():
+    backend = FakeBackend(latency=0.001, max_workers=8)
+    cache = GeocodeCache(':memory:')
+    job = GeocodingJob(GeocodingPipeline(backend, cache),
+                       ADDRESSES + ADDRESSES[:50] + [None, ''])
+    assert job.wait(timeout=30)
+    assert job.total == len(ADDRESSES)
+    assert backend.calls == len(ADDRESSES)
+    assert set(job.results) == set(ADDRESSES)
+
+    # 같은 주소로 새 작업을 만들면 모두 캐시에서 채워져 백엔드를 부르지 않는다.
+    again = GeocodingJob(GeocodingPipeline(backend, cache), ADDRESSES)
+    assert again.wait(timeout=30)
+    assert backend.calls == len(ADDRESSES)
+    assert again.results == job.results
+
+
+def test_failed_lookups_are_retried_and_not_recorded(monkeypatch):
+    monkeypatch.setattr(geocoding, 'RETRY_DELAYS', (0, 0))
+    backend = FakeBackend(latency=0, error_rate=0.3, max_workers=4)
+    cache = GeocodeCache(':memory:')
+    job = GeocodingJob(GeocodingPipeline(backend, cache), ADDRESSES)
+    assert job.wait(timeout=30)
+    assert job.failed
+    assert not set(job.failed) & set(job.results)
+    assert all(coords is not None for coords in job.results.values())
+    assert len(job.results) + len(job.failed) == len(ADDRESSES)
+    # 처음 한 번 + 재시도 두 번
+    assert backend.calls == len(ADDRESSES) + 2 * len(job.failed)
+    # 실패한 주소는 캐시에 남지 않는다.
+    assert not cache.get_many(job.failed)
@@ -0,0 +1,77 @@
+# --- parse_linestrings와 원래 행 단위 파서 비교 ---
+import random
+import re
+
+import numpy as np
+
+from geometry import parse_linestrings
+
+
+# 벡터화 이전 read_cable_data의 행 단위 파서
+def parse_linestring_old(text):
+    if not isinstance(text, str): return None
+    try:
+        coords_str = re.findall(r'(\d+\.\d+\s\d+\.\d+)', text)
+        if not coords_str: return None
+        return [[float(p.split()[1]),
+                 float(p.split()[0])] for p in coords_str]
+    except (ValueError, IndexError):
+        return None
+
+
+def assert_same_as_old(texts):
+    cable_coords, valid = parse_linestrings(texts)
+    expected = [parse_linestring_old(t) for t in texts]
+    assert valid.tolist() == [e is not None for e in expected]
+    for i, coords in enumerate(e for e in expected if e is not None):
+        np.testing.assert_array_equal(cable_coords[i], np.array(coords))
+    assert len(cable_coords) == int(valid.sum())
+
+
+EDGE_CASES = [
+    "LINESTRING (127.1 37.5, 127.2 37.6)",
+    "LINESTRING(127.123456789 37.5,127.2 37.6)",
+    "LINESTRING Z (127.1 37.5 10.0, 127.2 37.6 11.5)",
+    "MULTILINESTRING ((127.1 37.5, 127.2 37.6), (127.3 37.7, 127.4 37.8))",
+    "LINESTRING (127 37, 127.2 37.6)",
+    "LINESTRING (127.1  37.5, 127.2\t37.6)",
+    "LINESTRING (127.1.2 37.5, 127.2 37.6)",
+    "LINESTRING (.5 37.5, 127.2 37.6.)",
+    "LINESTRING (127.1 37.5, 127.2)",
+    "127.1 37.5 127.2",
+    "케이블 127.1 37.5, 127.2 37.6",
+    "LINESTRING (127.1 37.5)|(127.2 37.6)",
+    "LINESTRING (-127.1 -37.5, 1e3 2.0)",
+    "LINESTRING EMPTY",
+    "",
+    None,
+    float('nan'),
+    12.5,
+]
+
+
+def test_edge_cases():
+    assert_same_as_old(EDGE_CASES)
+
+
+def test_each_edge_case_alone():
+    for text in EDGE_CASES:
+        assert_same_as_old([text])
+
+
+def test_empty_column():
+    cable_coords, valid = parse_linestrings([])
+    assert len(cable_coords) == 0 and len(valid) == 0
+
+
+def test_fuzzed_rows():
+    rng = random.Random(0)
+    pieces = [
+        "127.5", "37.8", " ", "  ", ",", ", ", "(", ")", ".", "1", "12.",
+        ".3", "LINESTRING ", "Z", "\t", "가", "0.0", "-", "|", "1.2.3"
+    ]
+    texts = [
+        "".join(rng.choice(pieces) for _ in range(rng.randint(0, 30)))
+        for _ in range(2000)
+    ]
+    assert_same_as_old(texts)
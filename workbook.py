@@ -0,0 +1,113 @@
+# --- 엑셀 통합 문서 읽기 ---
+# openpyxl 읽기 전용(스트리밍) 모드로 파일을 한 번만 열고, 필요한 시트를 차례로 훑으며
+# 각 소비자가 선언한 컬럼만 골라 담는다. 한 파일의 여러 시트도 한 번 열어서 함께 읽는다.
+# 큰 시트는 chunk_rows 행씩 DataFrame 조각으로 내보내, 다음 조각을 읽기 전에
+# 앞 조각을 가공할 수 있게 한다.
+# 헤더는 첫 행이며, 이름 없는 칸은 pandas.read_excel처럼 'Unnamed: n'이 된다.
+import pandas as pd
+from openpyxl import load_workbook
+
+DEFAULT_CHUNK_ROWS = 5000
+
+
+def _open(path):
+    return load_workbook(path, read_only=True, data_only=True)
+
+
+def _worksheet(workbook, sheet):
+    if isinstance(sheet, int):
+        return workbook.worksheets[sheet] if sheet < len(
+            workbook.worksheets) else None
+    return workbook[sheet] if sheet in workbook.sheetnames else None
+
+
+def _header(row):
+    names, seen = [], {}
+    for i, value in enumerate(row):
+        name = f"Unnamed: {i}" if value is None else str(value)
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+# 빈 칸은 read_excel처럼 NaN으로, 값이 하나도 없는 컬럼은 float 컬럼으로 둔다.
+def _frame(rows, names):
+    df = pd.DataFrame(rows, columns=names)
+    for name in names:
+        column = df[name]
+        if column.isna().all():
+            df[name] = column.astype(float)
+        elif column.dtype == object and column.isna().any():
+            df[name] = column.where(column.notna(), float('nan'))
+    return df
+
+
+# 오른쪽 끝의 이름 없고 값도 없는 컬럼은 read_excel처럼 뺀다.
+def _trim_unnamed(df):
+    keep = len(df.columns)
+    while keep and str(df.columns[keep - 1]).startswith('Unnamed: ') and (
+            df.iloc[:, keep - 1].isna().all()):
+        keep -= 1
+    return df.iloc[:, :keep]
+
+
+# 시트를 chunk_rows 행씩 DataFrame 조각으로 읽는다. columns가 있으면 그 컬럼만
+# (시트에 있는 것만, 선언한 순서대로) 담는다. 빈 시트도 컬럼만 있는 조각 하나를 내보낸다.
+def _sheet_chunks(worksheet, columns=None, chunk_rows=DEFAULT_CHUNK_ROWS):
+    rows = worksheet.iter_rows(values_only=True)
+    header = _header(next(rows, ()))
+    if columns is None:
+        positions = list(range(len(header)))
+    else:
+        positions = [header.index(c) for c in columns if c in header]
+    names = [header[i] for i in positions]
+
+    # 빈 행은 뒤에 값이 있는 행이 나올 때만 넣는다(시트 끝의 빈 행은 버린다).
+    chunk, blanks, emitted = [], 0, False
+    for row in rows:
+        if all(v is None for v in row):
+            blanks += 1
+            continue
+        chunk.extend([[None] * len(positions)] * blanks)
+        blanks = 0
+        chunk.append([row[i] if i < len(row) else None for i in positions])
+        if len(chunk) >= chunk_rows:
+            yield _frame(chunk, names)
+            chunk, emitted = [], True
+    if chunk or not emitted:
+        yield _frame(chunk, names)
+
+
+def iter_sheet_chunks(path, sheet=0, columns=None,
+                      chunk_rows=DEFAULT_CHUNK_ROWS):
+    workbook = _open(path)
+    try:
+        worksheet = _worksheet(workbook, sheet)
+        if worksheet is None:
+            raise KeyError(f"시트를 찾을 수 없습니다: {sheet}")
+        yield from _sheet_chunks(worksheet, columns, chunk_rows)
+    finally:
+        workbook.close()
+
+
+# sheets: {시트(이름 또는 번호): 컬럼 목록 또는 None(전체)}
+# 반환값: {시트: DataFrame 또는 None(시트 없음)}
+def read_sheets(path, sheets):
+    workbook = _open(path)
+    try:
+        frames = {}
+        for sheet, columns in sheets.items():
+            worksheet = _worksheet(workbook, sheet)
+            if worksheet is None:
+                frames[sheet] = None
+                continue
+            parts = list(_sheet_chunks(worksheet, columns))
+            df = pd.concat(parts, ignore_index=True)
+            frames[sheet] = _trim_unnamed(df) if columns is None else df
+        return frames
+    finally:
+        workbook.close()